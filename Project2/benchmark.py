@@ -0,0 +1,159 @@
+"""
+Search speed benchmarks for the Partitions AI.
+
+Run with:  python benchmark.py
+           python benchmark.py --profile   (cProfile report of one Minimax and one MCTS move)
+"""
+import os
+import random
+import subprocess
+import sys
+import time
+from copy import deepcopy
+
+from partitions_engine import PartitionsGame, MinimaxAI, MCTSNode, AIPlayer, batch_playouts
+
+# (board size, search depth, stones placed before searching)
+MINIMAX_CASES = [(5, 4, 40), (7, 3, 60)]
+# (board size, search depth, stones placed before searching) for alpha-beta vs principal variation search
+PVS_CASES = [(5, 4, 20), (5, 5, 35), (7, 3, 30), (7, 4, 40), (9, 3, 30), (9, 3, 80)]
+# (board size, stones placed before the playouts)
+PLAYOUT_CASES = [(5, 10), (9, 20), (13, 20)]
+PLAYOUT_BATCH = 256
+# (board size, stones placed) of the position profiled by --profile
+PROFILE_CASE = (7, 20)
+PROFILE_LINES = 15
+# Headless tools import the engine for every process, so keep it cheap
+ENGINE_IMPORT_TARGET = 0.05  # seconds
+
+
+class CopyingMinimaxAI(MinimaxAI):
+    """Reference search that deep-copies the game for every child, as Minimax originally did."""
+
+    def minimax(self, game, depth, alpha, beta, maximizing_player):
+        self.nodes += 1
+        if depth == 0 or game.check_game_end():
+            return game.evaluate_score(), None
+
+        best_move = None
+        moves = game.get_empty_cells()
+        moves.sort(key=lambda move: self.heuristic_bonus(game, move[0], move[1], game.current_player), reverse=True)
+
+        best_eval = float('-inf') if maximizing_player else float('inf')
+        for (x, y) in moves:
+            bonus = self.heuristic_bonus(game, x, y, game.current_player)
+            new_game = deepcopy(game)
+            new_game.make_move(x, y)
+            if maximizing_player:
+                eval, _ = self.minimax(new_game, depth - 1, alpha - bonus, beta - bonus, False)
+                eval += bonus
+                if eval > best_eval:
+                    best_eval, best_move = eval, (x, y)
+                alpha = max(alpha, eval)
+            else:
+                eval, _ = self.minimax(new_game, depth - 1, alpha + bonus, beta + bonus, True)
+                eval -= bonus
+                if eval < best_eval:
+                    best_eval, best_move = eval, (x, y)
+                beta = min(beta, eval)
+            if beta <= alpha:
+                break
+        return best_eval, best_move
+
+
+def random_position(board_size, stones, seed=0):
+    """Play `stones` random moves on an empty board."""
+    rng = random.Random(seed)
+    game = PartitionsGame(board_size)
+    for _ in range(stones):
+        game.make_move(*rng.choice(game.get_empty_cells()))
+    return game
+
+
+def nodes_per_second(ai, game, depth):
+    ai.nodes = 0
+    start = time.perf_counter()
+    ai.minimax(game.copy(), depth, float('-inf'), float('inf'), True)
+    elapsed = time.perf_counter() - start
+    return ai.nodes, elapsed, ai.nodes / elapsed
+
+
+def benchmark_minimax():
+    print("Minimax nodes per second (copy per node -> push/pop)")
+    for board_size, depth, stones in MINIMAX_CASES:
+        game = random_position(board_size, stones)
+        before = nodes_per_second(CopyingMinimaxAI(), game, depth)
+        after = nodes_per_second(MinimaxAI(), game, depth)
+        print(f"  size {board_size} depth {depth}: {before[0]} -> {after[0]} nodes, "
+              f"{before[2]:,.0f} -> {after[2]:,.0f} nodes/s, "
+              f"{before[1]:.2f}s -> {after[1]:.2f}s")
+
+
+def benchmark_pvs():
+    print("Minimax nodes, alpha-beta -> principal variation search")
+    for board_size, depth, stones in PVS_CASES:
+        game = random_position(board_size, stones)
+        counts = []
+        for pvs in (False, True):
+            ai = MinimaxAI(pvs=pvs)
+            ai.minimax(game.copy(), depth, float('-inf'), float('inf'), True)
+            fixed = ai.nodes
+            # Iterative deepening, where PVS also uses aspiration windows
+            ai = MinimaxAI(pvs=pvs)
+            ai.iterative_deepening(game, max_depth=depth)
+            counts.append((fixed, ai.nodes))
+        (fixed, deepening), (pvs_fixed, pvs_deepening) = counts
+        print(f"  size {board_size} depth {depth}: {fixed} -> {pvs_fixed} nodes ({pvs_fixed / fixed - 1:+.1%}), "
+              f"iterative deepening {deepening} -> {pvs_deepening} nodes ({pvs_deepening / deepening - 1:+.1%})")
+
+
+def benchmark_playouts():
+    print(f"MCTS playouts per second (one at a time -> batches of {PLAYOUT_BATCH})")
+    for board_size, stones in PLAYOUT_CASES:
+        positions = [random_position(board_size, stones, seed) for seed in range(PLAYOUT_BATCH)]
+        start = time.perf_counter()
+        for game in positions:
+            MCTSNode().simulate(game.copy())
+        before = PLAYOUT_BATCH / (time.perf_counter() - start)
+        # The first batch imports NumPy and builds the geometry's arrays
+        batch_playouts(positions[:1])
+        start = time.perf_counter()
+        batch_playouts(positions)
+        after = PLAYOUT_BATCH / (time.perf_counter() - start)
+        print(f"  size {board_size}: {before:,.0f} -> {after:,.0f} playouts/s ({after / before:.1f}x)")
+
+
+def benchmark_import(runs=5):
+    """Time `import partitions_engine` in fresh interpreters and check it loads no GUI code."""
+    code = ("import sys, time; start = time.perf_counter(); import partitions_engine; "
+            "print(time.perf_counter() - start, 'pygame' in sys.modules)")
+    here = os.path.dirname(os.path.abspath(__file__))
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True, text=True, check=True).stdout
+        seconds, loaded_pygame = output.split()
+        timings.append(float(seconds))
+    best = min(timings)
+    status = "ok" if best <= ENGINE_IMPORT_TARGET and loaded_pygame == "False" else "OVER TARGET"
+    print(f"Engine import: {best * 1000:.1f} ms (target {ENGINE_IMPORT_TARGET * 1000:.0f} ms), "
+          f"pygame loaded: {loaded_pygame} -> {status}")
+
+
+def profile_searches():
+    """Print the search stats and the most expensive functions of one move per algorithm."""
+    game = random_position(*PROFILE_CASE)
+    for algorithm in ("minimax", "mcts"):
+        ai = AIPlayer("hard", algorithm, use_book=False, profile=True)
+        _, stats = ai.search(game.copy())
+        print(stats)
+        stats.profile.sort_stats("cumulative").print_stats(PROFILE_LINES)
+
+
+if __name__ == '__main__':
+    if "--profile" in sys.argv:
+        profile_searches()
+        sys.exit()
+    benchmark_import()
+    benchmark_minimax()
+    benchmark_pvs()
+    benchmark_playouts()
@@ -0,0 +1,198 @@
+"""
+Streaming game logs.
+
+GameLogWriter appends every move to its own CSV file as the game goes
+(flushed every few moves), and one summary row per game to games.csv in
+the same directory, so memory use does not grow with the game and earlier
+games are never overwritten.
+
+MoveArchive optionally keeps the same moves in a compact columnar form:
+chunks of NumPy structured arrays saved as .npy files, which analysis code
+can memory-map with iter_chunks() without loading the whole archive. Open
+one archive per process and flush() it when done; a short last chunk is
+topped up by later writes, also from the next process that opens the
+directory. One process writes to an archive directory at a time.
+"""
+import csv
+import glob
+import itertools
+import os
+import time
+
+from partitions_engine import WHITE
+
+FIELDNAMES = ["play", "player", "algorithm", "position", "time (s)", "score_white", "score_black"]
+# SearchStats of the move (zero for human moves), after the move columns
+STATS_FIELDNAMES = ["nodes", "cutoffs", "tt_hits", "evaluations", "evaluation_time (s)", "playouts", "max_depth"]
+GAME_FIELDNAMES = ["game", "board_size", "moves", "total_time (s)", "winner"]
+# Buffered moves are written out this often
+FLUSH_EVERY = 32
+# Rows per archive chunk file
+CHUNK_ROWS = 1 << 16
+ALGORITHMS = ["Human", "minimax", "mcts"]
+# Tells apart games started by one process within the same second
+_game_numbers = itertools.count(1)
+
+# Archive column layouts; algorithm is an index into ALGORITHMS
+MOVE_FIELDS = [("game", "<u4"), ("play", "<u2"), ("player", "i1"), ("algorithm", "u1"),
+               ("row", "u1"), ("col", "u1"), ("time", "<f4"), ("score_white", "<i2"), ("score_black", "<i2")]
+GAME_FIELDS = [("game", "<u4"), ("board_size", "u1"), ("winner", "i1"), ("moves", "<u2"), ("total_time", "<f4")]
+
+
+class MoveArchive:
+    """Append-only store of moves and game results in chunked .npy files."""
+
+    def __init__(self, directory, chunk_rows=CHUNK_ROWS):
+        import numpy as np
+        self.np = np
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.move_dtype = np.dtype(MOVE_FIELDS)
+        self.game_dtype = np.dtype(GAME_FIELDS)
+        os.makedirs(directory, exist_ok=True)
+        # Game numbers continue after the games already archived
+        self.next_game = sum(len(chunk) for chunk in iter_chunks(directory, "games"))
+        # Number of the chunk file each kind writes next
+        self.chunks = {}
+        self.moves = self._reopen("moves")
+        self.games = self._reopen("games")
+
+    def _reopen(self, kind):
+        """Count the chunks of kind; the rows of a short last chunk are returned to be rewritten fuller."""
+        paths = _chunk_paths(self.directory, kind)
+        self.chunks[kind] = len(paths)
+        if paths:
+            last = self.np.load(paths[-1])
+            if len(last) < self.chunk_rows:
+                self.chunks[kind] -= 1
+                return last.tolist()
+        return []
+
+    def new_game(self):
+        game = self.next_game
+        self.next_game += 1
+        return game
+
+    def add_move(self, game, play, player, algorithm, move, move_time, score_white, score_black):
+        self.moves.append((game, play, player, ALGORITHMS.index(algorithm), move[0], move[1],
+                           move_time, score_white, score_black))
+        if len(self.moves) >= self.chunk_rows:
+            self._write("moves", self.moves, self.move_dtype)
+
+    def add_game(self, game, board_size, winner, moves, total_time):
+        self.games.append((game, board_size, winner, moves, total_time))
+        if len(self.games) >= self.chunk_rows:
+            self._write("games", self.games, self.game_dtype)
+
+    def flush(self):
+        """Write the buffered rows as short last chunks, which later writes fill up and replace."""
+        self._write("moves", self.moves, self.move_dtype, full=False)
+        self._write("games", self.games, self.game_dtype, full=False)
+
+    def _write(self, kind, rows, dtype, full=True):
+        if not rows:
+            return
+        path = os.path.join(self.directory, f"{kind}-{self.chunks[kind]:06d}.npy")
+        # Written aside and renamed, so readers and a crash never see a half-written chunk
+        temporary = path[:-len(".npy")] + ".tmp.npy"
+        self.np.save(temporary, self.np.array(rows, dtype=dtype))
+        os.replace(temporary, path)
+        # A short chunk keeps its number and its rows stay buffered, so it is rewritten fuller later
+        if full:
+            self.chunks[kind] += 1
+            rows.clear()
+
+
+def _chunk_paths(directory, kind):
+    # Chunk files in order (not the .tmp.npy files being written)
+    return sorted(glob.glob(os.path.join(directory, f"{kind}-[0-9]*[0-9].npy")))
+
+
+def iter_chunks(directory, kind="moves"):
+    """Memory-mapped arrays of an archive's "moves" or "games" chunks, oldest first."""
+    import numpy as np
+    for path in _chunk_paths(directory, kind):
+        yield np.load(path, mmap_mode="r")
+
+
+def read_archive(directory, kind="moves"):
+    """All of an archive's "moves" or "games" rows as one array."""
+    import numpy as np
+    chunks = list(iter_chunks(directory, kind))
+    if not chunks:
+        return np.zeros(0, dtype=MOVE_FIELDS if kind == "moves" else GAME_FIELDS)
+    return np.concatenate(chunks)
+
+
+class GameLogWriter:
+    """Streams the moves of one game to <directory>/game_<id>.csv."""
+
+    def __init__(self, board_size, directory="logs", archive=None, flush_every=FLUSH_EVERY):
+        self.board_size = board_size
+        self.directory = directory
+        self.archive = archive
+        self.flush_every = flush_every
+        os.makedirs(directory, exist_ok=True)
+        self.game_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_game_numbers)}"
+        self.archive_game = archive.new_game() if archive is not None else None
+        self.path = os.path.join(directory, f"game_{self.game_id}.csv")
+        self.file = open(self.path, mode="w", newline="")
+        self.writer = csv.DictWriter(self.file, fieldnames=FIELDNAMES + STATS_FIELDNAMES)
+        self.writer.writeheader()
+        self.buffer = []
+        self.moves = 0
+
+    def log_move(self, player, algorithm, move, move_time, score_white, score_black, stats=None):
+        """Record one move; algorithm is "Human", "minimax" or "mcts", stats the search's SearchStats."""
+        self.moves += 1
+        row = {
+            "play": self.moves,
+            "player": "White" if player == WHITE else "Black",
+            "algorithm": algorithm,
+            "position": f"({move[0]},{move[1]})",
+            "time (s)": move_time,
+            "score_white": score_white,
+            "score_black": score_black
+        }
+        if stats is None:
+            row.update(dict.fromkeys(STATS_FIELDNAMES, 0))
+        else:
+            row.update({
+                "nodes": stats.nodes,
+                "cutoffs": stats.cutoffs,
+                "tt_hits": stats.tt_hits,
+                "evaluations": stats.evaluations,
+                "evaluation_time (s)": round(stats.evaluation_time, 6),
+                "playouts": stats.playouts,
+                "max_depth": stats.max_depth
+            })
+        self.buffer.append(row)
+        if self.archive is not None:
+            self.archive.add_move(self.archive_game, self.moves, player, algorithm, move, move_time,
+                                  score_white, score_black)
+        if len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        self.writer.writerows(self.buffer)
+        self.buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        """Write the buffered moves and close the move file (an abandoned game gets no summary)."""
+        self.flush()
+        self.file.close()
+
+    def finish(self, total_time, winner):
+        """Close the move file and add the game's summary row to games.csv."""
+        self.close()
+        games_path = os.path.join(self.directory, "games.csv")
+        new_file = not os.path.exists(games_path)
+        with open(games_path, mode="a", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=GAME_FIELDNAMES)
+            if new_file:
+                writer.writeheader()
+            writer.writerow({"game": self.game_id, "board_size": self.board_size, "moves": self.moves,
+                             "total_time (s)": total_time, "winner": "White" if winner == WHITE else "Black"})
+        if self.archive is not None:
+            self.archive.add_game(self.archive_game, self.board_size, winner, self.moves, total_time)
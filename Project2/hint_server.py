@@ -0,0 +1,222 @@
+"""
+Move-suggestion service for many concurrent human games.
+
+Requests and responses are JSON objects, one per line, read from stdin and
+written to stdout, or exchanged over TCP with --port:
+
+    {"id": 7, "board_size": 5, "board": [[0, 1, ...], ...], "current_player": -1}
+    {"id": 8, "board_size": 5, "moves": [[0, 0], [4, 4]]}
+
+    {"id": 7, "move": [3, 2], "cached": false}
+    {"id": 8, "error": "board_size must be odd and between 5 and 25"}
+
+Every request gets exactly one response; invalid positions and failed
+searches are answered with an "error".
+
+Searches run in a process pool. Identical positions that are already being
+searched share one search, and recent answers are kept in an LRU cache
+keyed by the position's Zobrist key, so repeated hint requests are answered
+at once. Keys go through canonical_position, but the board has no
+symmetry other than the identity, so only identical positions share an
+entry.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from partitions_engine import (PartitionsGame, MinimaxAI, EMPTY, WHITE, BLACK, suggest_move,
+                               canonical_position, to_canonical_move, from_canonical_move)
+
+# Largest board searched, so one request can't tie up a worker for minutes
+MAX_BOARD_SIZE = 25
+
+
+def load_position(request):
+    """Build the game described by a request (a board and player to move, or a list of moves).
+
+    Raises ValueError for anything that is not a valid position.
+    """
+    if not isinstance(request, dict):
+        raise ValueError("request must be a JSON object")
+    board_size = int(request["board_size"])
+    if not 5 <= board_size <= MAX_BOARD_SIZE or board_size % 2 == 0:
+        raise ValueError(f"board_size must be odd and between 5 and {MAX_BOARD_SIZE}")
+    player = request.get("current_player", WHITE)
+    if type(player) is not int or player not in (WHITE, BLACK):
+        raise ValueError("current_player must be 1 (White) or -1 (Black)")
+    game = PartitionsGame(board_size)
+    if "board" in request:
+        rows = request["board"]
+        if [len(row) for row in rows] != game.geometry.row_lengths:
+            raise ValueError("board rows do not match board_size")
+        if any(type(cell) is not int or cell not in (EMPTY, WHITE, BLACK) for row in rows for cell in row):
+            raise ValueError("board cells must be 0 (empty), 1 (White) or -1 (Black)")
+        game.board = rows
+        game.current_player = player
+    else:
+        for x, y in request.get("moves", []):
+            if not game.make_move(x, y):
+                raise ValueError(f"illegal move ({x}, {y})")
+    return game
+
+
+def compute_hint(game, time_limit=None):
+    """Worker-side search; the same move the GUI's 'H' key would suggest."""
+    if game.check_game_end():
+        return None
+    if time_limit is not None:
+        return MinimaxAI().best_move(game, time_limit=time_limit)
+    return suggest_move(game)
+
+
+class HintService:
+    """Answers hint requests from a cache, a shared in-flight search, or a new search in the pool."""
+
+    def __init__(self, workers=None, cache_size=10000, time_limit=None):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.cache_size = cache_size
+        self.time_limit = time_limit
+        self.cache = OrderedDict()   # canonical key -> canonical move, least recently used first
+        self.in_flight = {}          # canonical key -> task of the running search
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def position_key(game):
+        """Return (cache key, symmetry) for the position."""
+        key, symmetry = canonical_position(game)
+        return (game.board_size, key), symmetry
+
+    async def suggest(self, game):
+        """Return (move, cached) for the position."""
+        key, symmetry = self.position_key(game)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return self._untransform(game, self.cache[key], symmetry), True
+
+        self.misses += 1
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._search(key, game, symmetry))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        # The running search yields the canonical move, mapped back for this request
+        move = await asyncio.shield(task)
+        return self._untransform(game, move, symmetry), False
+
+    async def _search(self, key, game, symmetry):
+        loop = asyncio.get_running_loop()
+        try:
+            move = await loop.run_in_executor(self.executor, compute_hint, game, self.time_limit)
+        except BrokenProcessPool:
+            # A worker died; later requests get a fresh pool
+            self.executor.shutdown(wait=False)
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            raise
+        if move is not None:
+            move = to_canonical_move(game.geometry, move, symmetry)
+        self._remember(key, move)
+        return move
+
+    @staticmethod
+    def _untransform(game, move, symmetry):
+        return None if move is None else from_canonical_move(game.geometry, move, symmetry)
+
+    def _remember(self, key, move):
+        self.cache[key] = move
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    async def handle(self, line):
+        """Answer one JSON request line with one JSON response line."""
+        request_id = None
+        try:
+            request = json.loads(line)
+            if isinstance(request, dict):
+                request_id = request.get("id")
+            move, cached = await self.suggest(load_position(request))
+            response = {"id": request_id, "move": list(move) if move else None, "cached": cached}
+        except KeyError as error:
+            response = {"id": request_id, "error": f"missing field {error}"}
+        except (ValueError, TypeError) as error:
+            response = {"id": request_id, "error": str(error)}
+        except Exception as error:
+            # The search itself failed; answer anyway so the request is not left hanging
+            response = {"id": request_id, "error": f"search failed: {error!r}"}
+        return json.dumps(response) + "\n"
+
+    async def serve_stream(self, reader, write):
+        """Handle every request line from reader concurrently; answers are written as they finish."""
+        tasks = set()
+
+        async def answer(line):
+            write(await self.handle(line))
+
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if line.strip():
+                task = asyncio.create_task(answer(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    def close(self):
+        self.executor.shutdown()
+
+
+async def serve_stdio(service):
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+    def write(text):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    await service.serve_stream(reader, write)
+
+
+async def serve_tcp(service, host, port):
+    async def client(reader, writer):
+        await service.serve_stream(reader, lambda text: writer.write(text.encode()))
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(client, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Partitions move hints as JSON lines.")
+    parser.add_argument("--port", type=int, default=None, help="listen on TCP instead of stdin/stdout")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="search processes")
+    parser.add_argument("--cache-size", type=int, default=10000, help="positions kept in the LRU cache")
+    parser.add_argument("--time-limit", type=float, default=None, help="seconds per search (default: suggest_move depth)")
+    args = parser.parse_args()
+
+    service = HintService(args.workers, args.cache_size, args.time_limit)
+    try:
+        if args.port is None:
+            asyncio.run(serve_stdio(service))
+        else:
+            asyncio.run(serve_tcp(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
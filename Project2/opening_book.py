@@ -0,0 +1,183 @@
+"""
+Opening book for the Partitions Minimax AI.
+
+The builder searches every position of the first few plies much deeper than
+the AI would during a game and writes the chosen moves to a small binary
+file. AIPlayer memory-maps that file and answers book positions with a
+single hash-table probe instead of a search.
+
+File layout (little endian):
+    header  magic b"PBK1", board size (u16), plies (u16), search depth (u16), slot count (u32)
+    slots   slot count x (canonical position key u64, canonical move cell index u16)
+
+The slots form an open-addressing hash table with linear probing, indexed
+by the low bits of the key; a move of 0xFFFF marks an empty slot.
+
+Build the books with:
+    python opening_book.py --sizes 5 7 9 --workers 8
+"""
+import argparse
+import mmap
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from partitions_engine import (PartitionsGame, MinimaxAI, canonical_position,
+                               to_canonical_move, from_canonical_move)
+
+MAGIC = b"PBK1"
+HEADER = struct.Struct("<4sHHHI")
+SLOT = struct.Struct("<QH")
+EMPTY_SLOT = 0xFFFF
+BOOK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "books")
+# board size -> (plies covered, search depth)
+BOOK_SETTINGS = {5: (3, 5), 7: (2, 4), 9: (2, 3)}
+
+
+def book_path(board_size, directory=BOOK_DIR):
+    return os.path.join(directory, f"partitions_{board_size}.book")
+
+
+class OpeningBook:
+    """Read-only view of a book file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.board_size, self.plies, self.depth, self.slots = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or len(self.data) != HEADER.size + self.slots * SLOT.size:
+            self.data.close()
+            raise ValueError(f"{path} is not a Partitions opening book")
+        self.mask = self.slots - 1
+
+    def lookup(self, game):
+        """Return the book move for the position, or None if it is not in the book."""
+        if game.board_size != self.board_size or game.geometry.num_cells - game.empty_count >= self.plies:
+            return None
+        key, symmetry = canonical_position(game)
+        i = key & self.mask
+        while True:
+            slot_key, cell = SLOT.unpack_from(self.data, HEADER.size + i * SLOT.size)
+            if cell == EMPTY_SLOT:
+                return None
+            if slot_key == key:
+                return from_canonical_move(game.geometry, game.geometry.coords[cell], symmetry)
+            i = (i + 1) & self.mask
+
+    def close(self):
+        self.data.close()
+
+
+_books = {}
+
+
+def load_book(board_size):
+    """The installed book for board_size, or None if it has not been built."""
+    if board_size not in _books:
+        path = book_path(board_size)
+        _books[board_size] = OpeningBook(path) if os.path.exists(path) else None
+    return _books[board_size]
+
+
+def write_book(path, board_size, plies, depth, entries):
+    """Write {canonical key: canonical cell index} as a book file."""
+    slots = 1
+    while slots < 2 * len(entries):  # keep the table at most half full
+        slots *= 2
+    table = [None] * slots
+    for key, cell in entries.items():
+        i = key & (slots - 1)
+        while table[i] is not None:
+            i = (i + 1) & (slots - 1)
+        table[i] = (key, cell)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, board_size, plies, depth, slots))
+        for slot in table:
+            file.write(SLOT.pack(*slot) if slot is not None else SLOT.pack(0, EMPTY_SLOT))
+
+
+def search_position(board_size, moves, depth):
+    """Worker-side deep search of the position reached by `moves`."""
+    game = PartitionsGame(board_size)
+    for move in moves:
+        game.push(*move)
+    _, move = MinimaxAI().minimax(game, depth, float('-inf'), float('inf'), True)
+    return move
+
+
+def build_book(board_size, plies, depth, workers=1):
+    """Search the openings either side can reach while playing book moves.
+
+    A position is covered when all the White moves, or all the Black moves,
+    that led to it were book moves, so the book serves the AI with either
+    colour against any opponent. Positions are searched one ply at a time
+    because the next ply depends on the book moves of this one.
+    """
+    entries = {}
+    # (moves played, whether White / Black has only played book moves)
+    level = [((), True, True)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for ply in range(plies):
+            positions = {}
+            for moves, white_book, black_book in level:
+                game = PartitionsGame(board_size)
+                for move in moves:
+                    game.push(*move)
+                key, symmetry = canonical_position(game)
+                if key not in positions:
+                    positions[key] = (moves, symmetry, white_book, black_book)
+                else:
+                    # Transposition: keep the most permissive path flags
+                    first = positions[key]
+                    positions[key] = (first[0], first[1], first[2] or white_book, first[3] or black_book)
+            keys = list(positions)
+            book_moves = pool.map(search_position, [board_size] * len(keys),
+                                  [positions[key][0] for key in keys], [depth] * len(keys))
+
+            next_level = []
+            for key, book_move in zip(keys, book_moves):
+                moves, symmetry, white_book, black_book = positions[key]
+                game = PartitionsGame(board_size)
+                for move in moves:
+                    game.push(*move)
+                canonical = to_canonical_move(game.geometry, book_move, symmetry)
+                entries[key] = game.geometry.index(*canonical)
+                if ply + 1 == plies:
+                    continue
+                white_to_move = ply % 2 == 0
+                for move in game.get_empty_cells():
+                    is_book = move == book_move
+                    white = white_book and (is_book or not white_to_move)
+                    black = black_book and (is_book or white_to_move)
+                    if white or black:
+                        next_level.append((moves + (move,), white, black))
+            level = next_level
+            print(f"  size {board_size} ply {ply}: {len(keys)} positions")
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build Partitions opening books.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=sorted(BOOK_SETTINGS))
+    parser.add_argument("--plies", type=int, default=None, help="plies covered (default per size)")
+    parser.add_argument("--depth", type=int, default=None, help="search depth (default per size)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="search processes")
+    parser.add_argument("--output-dir", default=BOOK_DIR)
+    args = parser.parse_args()
+
+    for board_size in args.sizes:
+        plies, depth = BOOK_SETTINGS.get(board_size, (2, 3))
+        plies = args.plies or plies
+        depth = args.depth or depth
+        start = time.time()
+        entries = build_book(board_size, plies, depth, args.workers)
+        path = book_path(board_size, args.output_dir)
+        write_book(path, board_size, plies, depth, entries)
+        print(f"{len(entries)} positions in {time.time() - start:.1f}s, written to {path}")
+
+
+if __name__ == '__main__':
+    main()
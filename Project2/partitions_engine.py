@@ -0,0 +1,1602 @@
+"""
+Partitions game engine: board, scoring and the Minimax / MCTS players.
+
+This module has no GUI dependencies, so it can be imported by headless
+tools (tournaments, hint service, benchmarks) without pygame or a display.
+NumPy and the process pool are only imported by the code that uses them.
+"""
+import math
+import random
+import threading
+import time
+from array import array
+
+# Constants for players and cell states
+WHITE = 1
+BLACK = -1
+EMPTY = 0
+
+# Hexagonal neighbour offsets (row, col)
+HEX_DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, 1), (1, -1)]
+
+
+class HexGeometry:
+    """Cell indexing, neighbour and pixel tables shared by every board of one size."""
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+        self.num_rows = 2 * board_size - 1
+        self.row_lengths = [board_size + min(row, 2 * board_size - row - 2) for row in range(self.num_rows)]
+        # First flat index of every row
+        self.row_starts = []
+        start = 0
+        for length in self.row_lengths:
+            self.row_starts.append(start)
+            start += length
+        self.num_cells = start
+        # Flat index -> (row, col)
+        self.coords = [(row, col) for row in range(self.num_rows) for col in range(self.row_lengths[row])]
+        # Flat index -> tuple of neighbouring flat indices
+        neighbors = []
+        for x, y in self.coords:
+            cell_neighbors = []
+            for dx, dy in HEX_DIRECTIONS:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < self.num_rows and 0 <= ny < self.row_lengths[nx]:
+                    cell_neighbors.append(self.row_starts[nx] + ny)
+            neighbors.append(tuple(cell_neighbors))
+        self.neighbors = tuple(neighbors)
+        # Zobrist keys per colour and cell, seeded by board size so keys are stable across runs
+        rng = random.Random(board_size)
+        self.zobrist = {WHITE: [rng.getrandbits(64) for _ in range(self.num_cells)],
+                        BLACK: [rng.getrandbits(64) for _ in range(self.num_cells)]}
+        self.zobrist_black_to_move = rng.getrandbits(64)
+        # Bitmask of each cell's neighbours, for the bitboard endgame solver
+        self.neighbor_masks = tuple(sum(1 << n for n in cell_neighbors) for cell_neighbors in self.neighbors)
+        self._neighbor_matrix = None
+        self._edge_arrays = None
+        self._symmetries = None
+        self._pixel_layouts = {}
+
+    def index(self, x, y):
+        return self.row_starts[x] + y
+
+    def neighbor_matrix(self):
+        """(cells, 6) NumPy array of neighbour indices, padded with num_cells for missing neighbours."""
+        if self._neighbor_matrix is None:
+            import numpy as np
+            matrix = np.full((self.num_cells, len(HEX_DIRECTIONS)), self.num_cells, dtype=np.intp)
+            for i, cell_neighbors in enumerate(self.neighbors):
+                matrix[i, :len(cell_neighbors)] = cell_neighbors
+            self._neighbor_matrix = matrix
+        return self._neighbor_matrix
+
+    def edge_arrays(self):
+        """(first, second) NumPy arrays of cell indices listing every pair of neighbours once, first < second."""
+        if self._edge_arrays is None:
+            import numpy as np
+            pairs = [(i, n) for i, cell_neighbors in enumerate(self.neighbors) for n in cell_neighbors if i < n]
+            self._edge_arrays = (np.array([i for i, _ in pairs], dtype=np.intp), np.array([n for _, n in pairs], dtype=np.intp))
+        return self._edge_arrays
+
+    def pixel_layout(self, cell_radius):
+        """Cell centres as drawn by the GUI, relative to the window centre, and a grid for picking.
+
+        Returns (centers, grid, bucket): centers[i] is the (dx, dy) pixel
+        offset of cell i, and grid maps (dx // bucket, dy // bucket) to the
+        cells whose circle reaches into that bucket, so a point is tested
+        against at most a handful of cells.
+        """
+        layout = self._pixel_layouts.get(cell_radius)
+        if layout is None:
+            hex_height = math.sqrt(3) * cell_radius
+            centers = []
+            for row, col in self.coords:
+                num_cols = self.row_lengths[row]
+                centers.append(((col * 2 * cell_radius) - (num_cols - 1) * cell_radius,
+                                (row - self.num_rows // 2) * hex_height))
+            bucket = 2 * cell_radius
+            grid = {}
+            for i, (dx, dy) in enumerate(centers):
+                for bx in range(math.floor((dx - cell_radius) / bucket), math.floor((dx + cell_radius) / bucket) + 1):
+                    for by in range(math.floor((dy - cell_radius) / bucket), math.floor((dy + cell_radius) / bucket) + 1):
+                        grid.setdefault((bx, by), []).append(i)
+            layout = self._pixel_layouts[cell_radius] = (tuple(centers), grid, bucket)
+        return layout
+
+    def cell_at(self, dx, dy, cell_radius):
+        """(row, col) of the cell drawn under pixel offset (dx, dy) from the window centre, or None."""
+        centers, grid, bucket = self.pixel_layout(cell_radius)
+        for i in grid.get((math.floor(dx / bucket), math.floor(dy / bucket)), ()):
+            cx, cy = centers[i]
+            if math.hypot(dx - cx, dy - cy) <= cell_radius:
+                return self.coords[i]
+        return None
+
+    def symmetries(self):
+        """Cell permutations (perm[i] = image of cell i) that map the board onto itself.
+
+        The candidates are the 12 symmetries of the hexagon as drawn (6
+        rotations, each with or without a reflection). Only those that also
+        map every neighbour pair of the neighbour table to a neighbour pair
+        are kept, so scores and searches are unchanged by every permutation
+        returned. The identity always comes first. The neighbour table is
+        not symmetric, so on every board size it is also the only one.
+        """
+        if self._symmetries is None:
+            radius = self.board_size - 1
+            cube_index = {}
+            for i, (row, col) in enumerate(self.coords):
+                r = row - radius
+                q = col + max(-radius, -r - radius)
+                cube_index[(q, r, -q - r)] = i
+
+            symmetries = []
+            for reflect in (False, True):
+                for turns in range(6):
+                    perm = []
+                    for (q, r, s) in cube_index:
+                        if reflect:
+                            q, s = s, q
+                        for _ in range(turns):
+                            q, r, s = -r, -s, -q
+                        perm.append(cube_index[(q, r, s)])
+                    if all(set(perm[n] for n in self.neighbors[i]) == set(self.neighbors[perm[i]])
+                           for i in range(self.num_cells)):
+                        symmetries.append(tuple(perm))
+            self._symmetries = symmetries
+        return self._symmetries
+
+    def __reduce__(self):
+        # Pickle by board size so worker processes reuse their own cached tables
+        return (get_geometry, (self.board_size,))
+
+
+_geometry_cache = {}
+
+
+def get_geometry(board_size):
+    """Return the cached HexGeometry for a board size."""
+    geometry = _geometry_cache.get(board_size)
+    if geometry is None:
+        geometry = _geometry_cache[board_size] = HexGeometry(board_size)
+    return geometry
+
+
+def canonical_position(game):
+    """Canonical Zobrist key of a position over the board's symmetries.
+
+    Returns (key, symmetry): key is the smallest position key among all
+    symmetric variants, and symmetry the index in geometry.symmetries() of
+    the permutation that produces it. geometry.symmetries() is only the
+    identity for now, so this is position_key() with symmetry 0.
+    """
+    geometry = game.geometry
+    zobrist = geometry.zobrist
+    occupied = [(i, cell) for i, cell in enumerate(game.cells) if cell != EMPTY]
+    best = None
+    for symmetry, perm in enumerate(geometry.symmetries()):
+        key = geometry.zobrist_black_to_move if game.current_player == BLACK else 0
+        for i, cell in occupied:
+            key ^= zobrist[cell][perm[i]]
+        if best is None or key < best[0]:
+            best = (key, symmetry)
+    return best
+
+
+def to_canonical_move(geometry, move, symmetry):
+    """Map a move on the original board to the canonical board."""
+    perm = geometry.symmetries()[symmetry]
+    return geometry.coords[perm[geometry.index(*move)]]
+
+
+def from_canonical_move(geometry, move, symmetry):
+    """Map a move on the canonical board back to the original board."""
+    perm = geometry.symmetries()[symmetry]
+    return geometry.coords[perm.index(geometry.index(*move))]
+
+
+class PartitionsGame:
+    def __init__(self, board_size=5):
+        self.board_size = board_size
+        # Hexagonal board stored as one flat signed-byte buffer, row by row
+        self.geometry = get_geometry(board_size)
+        self.cells = array('b', bytes(self.geometry.num_cells))
+        self._reset_groups()
+
+        self.current_player = WHITE 
+        self.game_over = False 
+
+    def _reset_groups(self):
+        """Rebuild the same-colour union-find from the cell buffer (moves before it can't be undone)."""
+        num_cells = self.geometry.num_cells
+        # Flat indices of the moves played so far, used by pop() to undo them
+        self.history = []
+        # Union-find over cells (union by size, no path compression so unions can be undone)
+        self._parent = array('i', range(num_cells))
+        self._size = array('i', [1]) * num_cells
+        # (absorbed root, new root) for every union, and the number of unions per move
+        self._unions = []
+        self._unions_per_move = []
+        self._score = None
+        self.empty_count = self.cells.count(EMPTY)
+        # Zobrist key of the stones on the board, updated by push/pop
+        self.hash = self._compute_hash()
+        # Per player, the move-ordering bonus of every cell: 2 per own and 1 per
+        # opponent neighbour, kept up to date by push/pop
+        self.move_bonus = {WHITE: array('b', bytes(num_cells)), BLACK: array('b', bytes(num_cells))}
+
+        cells = self.cells
+        neighbors = self.geometry.neighbors
+        for i in range(num_cells):
+            if cells[i] != EMPTY:
+                own, other = self.move_bonus[cells[i]], self.move_bonus[-cells[i]]
+                for n in neighbors[i]:
+                    own[n] += 2
+                    other[n] += 1
+                    if n < i and cells[n] == cells[i]:
+                        self._union(i, n)
+        self._unions = []
+
+    def _compute_hash(self):
+        zobrist = self.geometry.zobrist
+        key = 0
+        for i, cell in enumerate(self.cells):
+            if cell != EMPTY:
+                key ^= zobrist[cell][i]
+        return key
+
+    def position_key(self):
+        """Zobrist key of the stones and the player to move."""
+        if self.current_player == BLACK:
+            return self.hash ^ self.geometry.zobrist_black_to_move
+        return self.hash
+
+    def copy(self):
+        """Return an independent copy of the game (a memcpy of the cell buffer)."""
+        new_game = PartitionsGame.__new__(PartitionsGame)
+        new_game.board_size = self.board_size
+        new_game.geometry = self.geometry
+        new_game.cells = self.cells[:]
+        new_game.history = self.history[:]
+        new_game._parent = self._parent[:]
+        new_game._size = self._size[:]
+        new_game._unions = self._unions[:]
+        new_game._unions_per_move = self._unions_per_move[:]
+        new_game._score = self._score
+        new_game.empty_count = self.empty_count
+        new_game.hash = self.hash
+        new_game.move_bonus = {WHITE: self.move_bonus[WHITE][:], BLACK: self.move_bonus[BLACK][:]}
+        new_game.current_player = self.current_player
+        new_game.game_over = self.game_over
+        return new_game
+
+    clone = copy
+    __copy__ = copy
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    @property
+    def board(self):
+        """Ragged list-of-lists snapshot of the board, indexed as board[row][col]."""
+        geometry = self.geometry
+        return [self.cells[start:start + length].tolist() for start, length in zip(geometry.row_starts, geometry.row_lengths)]
+
+    @board.setter
+    def board(self, rows):
+        self.cells = array('b', [cell for row in rows for cell in row])
+        self._reset_groups()
+
+    def get_cell(self, x, y):
+        return self.cells[self.geometry.row_starts[x] + y]
+    
+    def is_valid_move(self, x, y):
+        # Check if the move is inside the board and the cell is empty
+        geometry = self.geometry
+        return 0 <= x < geometry.num_rows and 0 <= y < geometry.row_lengths[x] and self.cells[geometry.row_starts[x] + y] == EMPTY
+
+
+    def make_move(self, x, y):
+        # Make a move if valid, then switch the player
+        if self.is_valid_move(x, y):
+            self.push(x, y)
+            return True
+        return False
+
+    def push(self, x, y):
+        """Play (x, y) in place without validation; pop() undoes it."""
+        i = self.geometry.row_starts[x] + y
+        color = self.current_player
+        cells = self.cells
+        cells[i] = color
+        own, other = self.move_bonus[color], self.move_bonus[-color]
+        # Merge the new stone with the same-coloured groups around it
+        unions = len(self._unions)
+        for n in self.geometry.neighbors[i]:
+            own[n] += 2
+            other[n] += 1
+            if cells[n] == color:
+                self._union(i, n)
+        self._unions_per_move.append(len(self._unions) - unions)
+        self.history.append(i)
+        self.empty_count -= 1
+        self._score = None
+        self.hash ^= self.geometry.zobrist[color][i]
+        self.current_player = -color
+
+    def pop(self):
+        """Undo the last move played with push() or make_move()."""
+        parent = self._parent
+        size = self._size
+        for _ in range(self._unions_per_move.pop()):
+            child, root = self._unions.pop()
+            parent[child] = child
+            size[root] -= size[child]
+        i = self.history.pop()
+        color = -self.current_player
+        self.cells[i] = EMPTY
+        own, other = self.move_bonus[color], self.move_bonus[-color]
+        for n in self.geometry.neighbors[i]:
+            own[n] -= 2
+            other[n] -= 1
+        self.empty_count += 1
+        self._score = None
+        self.hash ^= self.geometry.zobrist[color][i]
+        self.current_player = color
+
+    def _find(self, i):
+        parent = self._parent
+        while parent[i] != i:
+            i = parent[i]
+        return i
+
+    def _union(self, a, b):
+        a = self._find(a)
+        b = self._find(b)
+        if a == b:
+            return
+        if self._size[a] > self._size[b]:
+            a, b = b, a
+        self._parent[a] = b
+        self._size[b] += self._size[a]
+        self._unions.append((a, b))
+
+
+    def get_empty_cells(self):
+        """Return a list of all empty cells on the board."""
+        cells = self.cells
+        coords = self.geometry.coords
+        return [coords[i] for i in range(len(cells)) if cells[i] == EMPTY]
+
+    
+    
+    def check_game_end(self):
+        # Check if there are no more empty cells
+        return self.empty_count == 0
+
+    def _group_graph(self):
+        """Contract every same-coloured group to its union-find root.
+
+        Returns (roots, adjacency) where roots maps each occupied cell to its
+        group root and adjacency maps each group root to the set of
+        neighbouring group roots.
+        """
+        cells = self.cells
+        neighbors = self.geometry.neighbors
+        find = self._find
+        roots = {}
+        for i in range(len(cells)):
+            if cells[i] != EMPTY:
+                roots[i] = find(i)
+
+        adjacency = {root: set() for root in roots.values()}
+        for i, root in roots.items():
+            for n in neighbors[i]:
+                other = roots.get(n)
+                if other is not None and other != root:
+                    adjacency[root].add(other)
+        return roots, adjacency
+
+    def _removable_roots(self, adjacency):
+        """Group roots whose removal keeps the remaining stones connected.
+
+        One iterative Tarjan pass over the contracted group graph finds the
+        cut vertices and connected components, so the answer for every group
+        costs O(groups + contacts) in total.
+        """
+        order = {}
+        low = {}
+        cut_roots = set()
+        components = []
+        counter = 0
+        for start in adjacency:
+            if start in order:
+                continue
+            component = [start]
+            order[start] = low[start] = counter
+            counter += 1
+            start_children = 0
+            stack = [(start, None, iter(adjacency[start]))]
+            while stack:
+                node, parent, others = stack[-1]
+                for other in others:
+                    if other not in order:
+                        order[other] = low[other] = counter
+                        counter += 1
+                        component.append(other)
+                        stack.append((other, node, iter(adjacency[other])))
+                        break
+                    elif other != parent and order[other] < low[node]:
+                        low[node] = order[other]
+                else:
+                    stack.pop()
+                    if parent is None:
+                        continue
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                    if parent == start:
+                        start_children += 1
+                    elif low[node] >= order[parent]:
+                        cut_roots.add(parent)
+            if start_children > 1:
+                cut_roots.add(start)
+            components.append(component)
+
+        if len(components) == 1:
+            # Any group that is not a cut vertex can go
+            return [root for root in components[0] if root not in cut_roots]
+        if len(components) == 2:
+            # Only a lone group can go, leaving the other piece whole
+            return [component[0] for component in components if len(component) == 1]
+        return []
+
+    def removable_groups(self):
+        """List of (color, cells) for every group whose removal keeps the board connected."""
+        roots, adjacency = self._group_graph()
+        coords = self.geometry.coords
+        groups = {root: [] for root in self._removable_roots(adjacency)}
+        for i, root in roots.items():
+            if root in groups:
+                groups[root].append(coords[i])
+        return [(self.cells[root], cells) for root, cells in groups.items()]
+
+    def evaluate_score(self):
+        # The score only changes when a stone is played or taken back
+        if self._score is None:
+            _, adjacency = self._group_graph()
+            # White scores the black fragments and vice versa
+            score = 0
+            for root in self._removable_roots(adjacency):
+                if self.cells[root] == WHITE:
+                    score -= self._size[root]
+                else:
+                    score += self._size[root]
+            self._score = score
+
+        # Return the score as the difference between white and black fragment sizes
+        return self._score
+
+    def get_winner(self):
+        score = self.evaluate_score()
+        if score > 0:
+            return WHITE
+        elif score < 0:
+            return BLACK
+        else:
+            # Tie-breaker by inverting every fragment group
+            roots, adjacency = self._group_graph()
+            removable = set(self._removable_roots(adjacency))
+            new_game = self.copy()
+            for i, root in roots.items():
+                if root in removable:
+                    new_game.cells[i] = -self.cells[i]
+            new_game._reset_groups()
+
+            # Re-evaluate score after inversion and decide the winner
+            final_score = new_game.evaluate_score()
+            return WHITE if final_score > 0 else BLACK
+
+
+# Transposition table bound types
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+# Mixed into table keys so maximizing and minimizing nodes never share entries
+ZOBRIST_MAXIMIZING = random.Random('maximizing').getrandbits(64)
+# Half-width of the principal variation search's aspiration window
+ASPIRATION_WINDOW = 1
+
+
+class TranspositionTable:
+    """Fixed-size table of search results indexed by Zobrist key.
+
+    Each slot holds (key, depth, value, bound, best_move, generation). A slot
+    is overwritten by a deeper search of any position, and always by results
+    from a newer search (generation) so stale entries do not crowd out the
+    current one.
+    """
+
+    def __init__(self, size=1 << 16):
+        self.size = size
+        self.slots = [None] * size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def lookup(self, key):
+        entry = self.slots[key % self.size]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, value, bound, best_move):
+        index = key % self.size
+        entry = self.slots[index]
+        if entry is None or entry[0] == key or entry[5] != self.generation or depth >= entry[1]:
+            self.slots[index] = (key, depth, value, bound, best_move, self.generation)
+            self.stores += 1
+
+    def clear(self):
+        self.slots = [None] * self.size
+        self.hits = self.misses = self.stores = 0
+
+    def stats(self):
+        probes = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": self.hits / probes if probes else 0.0,
+        }
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time budget runs out."""
+
+
+class SearchStats:
+    """What one search spent its time on, filled in by MinimaxAI and the MCTS functions.
+
+    nodes are positions visited (Minimax) or tree nodes expanded (MCTS);
+    evaluations and evaluation_time count the evaluate_score calls at
+    Minimax leaves or the scoring at the end of MCTS playouts (a whole
+    batch_playouts call when batching). max_depth is the deepest completed
+    Minimax depth or the deepest MCTS tree path. time is the wall time of
+    the whole search, and profile a pstats.Stats when it was profiled.
+    """
+    FIELDS = ('nodes', 'cutoffs', 'tt_hits', 'evaluations', 'evaluation_time', 'playouts', 'max_depth', 'time')
+
+    def __init__(self, algorithm=None):
+        self.algorithm = algorithm
+        self.nodes = 0
+        self.cutoffs = 0
+        self.tt_hits = 0
+        self.evaluations = 0
+        self.evaluation_time = 0.0
+        self.playouts = 0
+        self.max_depth = 0
+        self.time = 0.0
+        self.profile = None
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __repr__(self):
+        return f"SearchStats({self.algorithm!r}, " + ", ".join(f"{k}={v}" for k, v in self.as_dict().items()) + ")"
+
+
+# Positions with this many empty cells or fewer are solved to the end
+ENDGAME_THRESHOLD = 10
+
+
+class EndgameSolver:
+    """Exact win/loss search of the last moves of a game on bitboards.
+
+    A position is two Python ints (one bit per cell for each colour).
+    Groups are found by flood fill with the geometry's neighbour masks and
+    sized with int.bit_count, and the final winner follows get_winner,
+    tie-breaker included. Results are kept in a table keyed by position,
+    so reuse one solver for a whole game. Like MinimaxAI.minimax, the
+    search raises SearchTimeout once deadline passes or stop is set.
+    """
+
+    def __init__(self, geometry, table_size=1 << 20):
+        self.geometry = geometry
+        # Only used for its _removable_roots, like batch_scores
+        self.scorer = PartitionsGame(geometry.board_size)
+        self.table_size = table_size
+        self.table = {}    # (white, black, player to move) -> winner
+        self.winners = {}  # (white, black) of a finished board -> winner
+        self.nodes = 0
+        self.deadline = None  # perf_counter() time at which the solve gives up
+        self.stop = None      # Optional threading.Event that ends a running solve
+
+    def solve(self, game, deadline=None, stop=None):
+        """Return (winner, move) with perfect play from both sides.
+
+        move wins for the player to move if any move does, otherwise it is
+        None (every move loses). Raises SearchTimeout if deadline
+        (perf_counter time) passes or stop is set first.
+        """
+        self.deadline = deadline
+        self.stop = stop
+        white = black = empty = 0
+        for i, cell in enumerate(game.cells):
+            if cell == WHITE:
+                white |= 1 << i
+            elif cell == BLACK:
+                black |= 1 << i
+            else:
+                empty |= 1 << i
+        if len(self.table) > self.table_size:
+            self.table.clear()
+            self.winners.clear()
+        self.nodes = 0
+
+        player = game.current_player
+        if not empty:
+            return self.winner(white, black), None
+        moves = empty
+        while moves:
+            bit = moves & -moves
+            moves ^= bit
+            if player == WHITE:
+                result = self._search(white | bit, black, empty ^ bit, BLACK)
+            else:
+                result = self._search(white, black | bit, empty ^ bit, WHITE)
+            if result == player:
+                return player, self.geometry.coords[bit.bit_length() - 1]
+        return -player, None
+
+    def _search(self, white, black, empty, player):
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        if self.stop is not None and self.stop.is_set():
+            raise SearchTimeout()
+        if not empty:
+            return self.winner(white, black)
+        key = (white, black, player)
+        result = self.table.get(key)
+        if result is not None:
+            return result
+
+        # The player to move wins if any move wins
+        result = -player
+        moves = empty
+        while moves:
+            bit = moves & -moves
+            moves ^= bit
+            if player == WHITE:
+                if self._search(white | bit, black, empty ^ bit, BLACK) == WHITE:
+                    result = WHITE
+                    break
+            elif self._search(white, black | bit, empty ^ bit, WHITE) == BLACK:
+                result = BLACK
+                break
+        self.table[key] = result
+        return result
+
+    def _groups(self, color, stones):
+        """(color, group mask, mask of the cells around it) for every group of stones."""
+        masks = self.geometry.neighbor_masks
+        groups = []
+        while stones:
+            group = frontier = stones & -stones
+            around = 0
+            while frontier:
+                grown = 0
+                while frontier:
+                    bit = frontier & -frontier
+                    grown |= masks[bit.bit_length() - 1]
+                    frontier ^= bit
+                around |= grown
+                frontier = grown & stones & ~group
+                group |= frontier
+            stones ^= group
+            groups.append((color, group, around & ~group))
+        return groups
+
+    def score(self, white, black):
+        """evaluate_score of a bitboard position, plus its removable groups."""
+        groups = self._groups(WHITE, white) + self._groups(BLACK, black)
+        adjacency = {k: [j for j, (_, group, _) in enumerate(groups) if group & around]
+                     for k, (_, _, around) in enumerate(groups)}
+        removable = [groups[k] for k in self.scorer._removable_roots(adjacency)]
+        # White scores the black fragments and vice versa
+        score = 0
+        for color, group, _ in removable:
+            score -= color * group.bit_count()
+        return score, removable
+
+    def winner(self, white, black):
+        """get_winner of a bitboard position."""
+        result = self.winners.get((white, black))
+        if result is None:
+            score, removable = self.score(white, black)
+            if score == 0:
+                # Tie-breaker by inverting every fragment group
+                inverted_white, inverted_black = white, black
+                for _, group, _ in removable:
+                    inverted_white ^= group
+                    inverted_black ^= group
+                score, _ = self.score(inverted_white, inverted_black)
+            result = self.winners[(white, black)] = WHITE if score > 0 else BLACK
+        return result
+
+
+class MinimaxAI:
+    def __init__(self, depth=3, table_size=1 << 16, endgame_threshold=ENDGAME_THRESHOLD, pvs=False):
+        self.depth = depth
+        # Principal variation search: null-window searches after the first move,
+        # and iterative deepening with aspiration windows
+        self.pvs = pvs
+        self.nodes = 0  # Nodes visited by the last search
+        self.deadline = None  # perf_counter() time at which a timed search gives up
+        # Kept between searches, so reuse one MinimaxAI for a whole game
+        self.table = TranspositionTable(table_size)
+        # Positions with this many empty cells or fewer are solved exactly (0 turns it off)
+        self.endgame_threshold = endgame_threshold
+        self.endgame = None
+        # Optional threading.Event; setting it makes a running search give up
+        self.stop = None
+        # Counters of the last search started by best_move
+        self.stats = SearchStats('minimax')
+        # Move ordering: two killer cells per ply from the root, and per player a
+        # history score per cell that grows with every cutoff the cell causes
+        self.killers = []
+        self.history = {WHITE: [], BLACK: []}
+
+    def heuristic_bonus(self, game, x, y, current_player):
+        # 2 per friendly and 1 per enemy neighbour, kept up to date by the game
+        return game.move_bonus[current_player][game.geometry.index(x, y)]
+
+    def order_moves(self, game, ply, table_move):
+        """Empty cell indices, most promising first.
+
+        The transposition table move comes first, then this ply's killer
+        moves, then the rest by heuristic bonus with the history score
+        breaking ties.
+        """
+        cells = game.cells
+        player = game.current_player
+        bonus = game.move_bonus[player]
+        history = self.history[player]
+        moves = [i for i in range(len(cells)) if cells[i] == EMPTY]
+        moves.sort(key=lambda i: (bonus[i], history[i]), reverse=True)
+        first = [i for i in self.killers[ply] if i is not None and cells[i] == EMPTY]
+        if table_move is not None:
+            table_move = game.geometry.index(*table_move)
+            if table_move in first:
+                first.remove(table_move)
+            first.insert(0, table_move)
+        for i in reversed(first):
+            moves.remove(i)
+            moves.insert(0, i)
+        return moves
+
+    def _prepare_ordering(self, game, depth):
+        """Fit the killer and history tables to the game before a search from its root."""
+        num_cells = game.geometry.num_cells
+        if len(self.history[WHITE]) != num_cells:
+            self.history = {WHITE: [0] * num_cells, BLACK: [0] * num_cells}
+            self.killers = []
+        while len(self.killers) <= depth:
+            self.killers.append([None, None])
+
+    def _record_cutoff(self, ply, depth, player, i):
+        """Remember a move that caused a beta cutoff as a killer and in the history table."""
+        killers = self.killers[ply]
+        if killers[0] != i:
+            killers[1] = killers[0]
+            killers[0] = i
+        self.history[player][i] += depth * depth
+
+    def age_history(self):
+        # Halve the history scores so older searches weigh less
+        for player in (WHITE, BLACK):
+            self.history[player] = [score >> 1 for score in self.history[player]]
+
+    def minimax(self, game, depth, alpha, beta, maximizing_player, ply=0):
+        # The search plays and undoes moves on the game itself instead of copying it
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        if self.stop is not None and self.stop.is_set():
+            raise SearchTimeout()
+        if depth == 0 or game.check_game_end():
+            return self.evaluate(game), None
+
+        key = game.position_key()
+        if maximizing_player:
+            key ^= ZOBRIST_MAXIMIZING
+        alpha_start, beta_start = alpha, beta
+        table_move = None
+        entry = self.table.lookup(key)
+        if entry is not None:
+            self.stats.tt_hits += 1
+            _, entry_depth, value, bound, table_move, _ = entry
+            if entry_depth >= depth:
+                if bound == EXACT:
+                    return value, table_move
+                elif bound == LOWER_BOUND:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if beta <= alpha:
+                    self.stats.cutoffs += 1
+                    return value, table_move
+
+        if ply == 0:
+            self._prepare_ordering(game, depth)
+        best_move = None
+        player = game.current_player
+        bonus = game.move_bonus[player]
+        coords = game.geometry.coords
+        moves = self.order_moves(game, ply, table_move)
+
+        if maximizing_player:
+            max_eval = float('-inf')
+            for i in moves:
+                move_bonus = bonus[i]
+                game.push(*coords[i])
+                # The bonus is added to the child's value, so its window is shifted by it
+                if self.pvs and best_move is not None:
+                    # Only prove the move is no better than alpha; search it fully if it is
+                    eval, _ = self.minimax(game, depth - 1, alpha - move_bonus, alpha + 1 - move_bonus, False, ply + 1)
+                    if alpha < eval + move_bonus < beta:
+                        eval, _ = self.minimax(game, depth - 1, alpha - move_bonus, beta - move_bonus, False, ply + 1)
+                else:
+                    eval, _ = self.minimax(game, depth - 1, alpha - move_bonus, beta - move_bonus, False, ply + 1)
+                game.pop()
+                eval += move_bonus
+                if eval > max_eval:
+                    max_eval = eval
+                    best_move = coords[i]
+                alpha = max(alpha, eval)
+                if beta <= alpha:
+                    self.stats.cutoffs += 1
+                    self._record_cutoff(ply, depth, player, i)
+                    break
+            self._store(key, depth, max_eval, alpha_start, beta_start, best_move)
+            return max_eval, best_move
+        else:
+            min_eval = float('inf')
+            for i in moves:
+                move_bonus = bonus[i]
+                game.push(*coords[i])
+                if self.pvs and best_move is not None:
+                    eval, _ = self.minimax(game, depth - 1, beta - 1 + move_bonus, beta + move_bonus, True, ply + 1)
+                    if alpha < eval - move_bonus < beta:
+                        eval, _ = self.minimax(game, depth - 1, alpha + move_bonus, beta + move_bonus, True, ply + 1)
+                else:
+                    eval, _ = self.minimax(game, depth - 1, alpha + move_bonus, beta + move_bonus, True, ply + 1)
+                game.pop()
+                eval -= move_bonus
+                if eval < min_eval:
+                    min_eval = eval
+                    best_move = coords[i]
+                beta = min(beta, eval)
+                if beta <= alpha:
+                    self.stats.cutoffs += 1
+                    self._record_cutoff(ply, depth, player, i)
+                    break
+            self._store(key, depth, min_eval, alpha_start, beta_start, best_move)
+            return min_eval, best_move
+
+    def evaluate(self, game):
+        """game.evaluate_score(), counted and timed in self.stats."""
+        stats = self.stats
+        start = time.perf_counter()
+        score = game.evaluate_score()
+        stats.evaluation_time += time.perf_counter() - start
+        stats.evaluations += 1
+        return score
+
+    def _store(self, key, depth, value, alpha, beta, best_move):
+        if value <= alpha:
+            bound = UPPER_BOUND
+        elif value >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.table.store(key, depth, value, bound, best_move)
+
+    def aspiration_search(self, root, depth, guess=None):
+        """Root minimax with a narrow window around guess, an expected score.
+
+        A score outside the window only bounds the true one, so the root is
+        then searched again with the full window. Without a guess the first
+        search uses the full window.
+        """
+        if guess is not None:
+            alpha, beta = guess - ASPIRATION_WINDOW, guess + ASPIRATION_WINDOW
+            value, move = self.minimax(root, depth, alpha, beta, True)
+            if alpha < value < beta:
+                return value, move
+        return self.minimax(root, depth, float('-inf'), float('inf'), True)
+
+    def best_move(self, game, time_limit=None):
+        return self.search(game, time_limit)[0]
+
+    def search(self, game, time_limit=None):
+        """Return (move, stats) where stats is the SearchStats of this search."""
+        self.stats = SearchStats('minimax')
+        start = time.perf_counter()
+        self.age_history()
+        move = self._search(game, time_limit)
+        self.stats.nodes = self.nodes
+        self.stats.max_depth = self.stats.max_depth or self.depth
+        self.stats.time = time.perf_counter() - start
+        return move, self.stats
+
+    def _search(self, game, time_limit):
+        # The solver and the search share one time budget
+        start = time.perf_counter()
+        if 0 < game.empty_count <= self.endgame_threshold:
+            deadline = start + time_limit if time_limit is not None else None
+            try:
+                move = self.solve_endgame(game, deadline)
+            except SearchTimeout:
+                if self.stop is not None and self.stop.is_set():
+                    return None
+                move = None
+            if move is not None:
+                return move
+            # Lost against perfect play, or out of time: fall back to the heuristic search
+        if time_limit is not None:
+            return self.iterative_deepening(game, time_limit, start=start)
+
+        # Defines the depth according to the board size
+        size = game.board_size
+        if size <= 5:
+            self.depth = 4
+        elif size <= 7:
+            self.depth = 3
+        elif size <= 9:
+            self.depth = 2
+        else:
+            self.depth = 1  
+
+        self.nodes = 0
+        self.table.new_search()
+        try:
+            _, move = self.minimax(game.copy(), self.depth, float('-inf'), float('inf'), True)
+        except SearchTimeout:
+            # Stopped from another thread
+            return None
+        if move is None:
+            empty_cells = game.get_empty_cells()
+            if empty_cells:
+                return random.choice(empty_cells)
+        return move
+
+    def solve_endgame(self, game, deadline=None):
+        """A winning move for the player to move found by the exact solver, or None if there is none.
+
+        Raises SearchTimeout if deadline passes or self.stop is set first.
+        """
+        if self.endgame is None or self.endgame.geometry is not game.geometry:
+            self.endgame = EndgameSolver(game.geometry)
+        try:
+            _, move = self.endgame.solve(game, deadline, self.stop)
+        finally:
+            self.nodes = self.endgame.nodes
+        self.stats.max_depth = game.empty_count
+        return move
+
+    def iterative_deepening(self, game, time_limit=None, max_depth=None, start=None):
+        """Search depth 1, 2, ... until time_limit seconds after start (default now) have passed or max_depth is done.
+
+        Returns the move of the deepest completed iteration. Each iteration
+        starts from the best moves the previous one stored in the
+        transposition table, so the principal variation is searched first.
+        With pvs each iteration after the second uses an aspiration window.
+        Depth 1 is always completed so there is a move to return.
+        """
+        if start is None:
+            start = time.perf_counter()
+        root = game.copy()
+        self.nodes = 0
+        self.table.new_search()
+        move = None
+        # Scores of the completed iterations; the bonuses make them alternate
+        # between odd and even depths, so the guess is the one two plies shallower
+        values = []
+        for depth in range(1, min(max_depth or root.empty_count, root.empty_count) + 1):
+            self.deadline = start + time_limit if time_limit is not None and move is not None else None
+            try:
+                if self.pvs:
+                    value, depth_move = self.aspiration_search(root, depth, values[-2] if depth > 2 else None)
+                else:
+                    value, depth_move = self.minimax(root, depth, float('-inf'), float('inf'), True)
+            except SearchTimeout:
+                # root is a throwaway copy, so stones left by the aborted search don't matter
+                break
+            finally:
+                self.deadline = None
+            move = depth_move
+            values.append(value)
+            self.depth = depth
+            if time_limit is not None and time.perf_counter() - start > time_limit:
+                break
+
+        if self.stop is not None and self.stop.is_set():
+            return None
+
+        if move is None:
+            empty_cells = game.get_empty_cells()
+            if empty_cells:
+                return random.choice(empty_cells)
+        return move
+
+
+class MCTSNode:
+    """One search-tree node: the move that reached it and its statistics.
+
+    Nodes hold no game state. The search replays moves from the root game
+    with push/pop on the way down and takes them back afterwards.
+    """
+    __slots__ = ('move', 'visits', 'value', 'children', 'untried_moves')
+
+    def __init__(self, move=None, untried_moves=None):
+        self.move = move           # Move that leads from the parent to this node
+        self.visits = 0            # Number of times this node was visited
+        self.value = 0             # Simulations won by the player to move here
+        self.children = ()         # Child nodes, a list once the first one is added
+        # Moves not yet tried from this state, filled in the first time the node is expanded
+        self.untried_moves = untried_moves
+
+    def select_child(self):
+        # Select the best child using UCB1 formula (exploitation + exploration)
+        return max(self.children, key=lambda c: c.value / (c.visits + 1e-6) +
+                   math.sqrt(2 * math.log(self.visits + 1) / (c.visits + 1e-6)))
+
+    def expand(self, game):
+        # Expand the node by trying one of the untried moves, playing it on game
+        if self.untried_moves:
+            move = self.untried_moves.pop()
+            game.push(*move)
+            child_node = MCTSNode(move)
+            if not self.children:
+                self.children = []
+            self.children.append(child_node)
+            return child_node
+        return None
+
+    def simulate(self, game, stats=None):
+        # Perform a heuristic playout from the current state, then take it back
+        max_simulated_moves = 20 
+        moves_played = 0
+        while not game.check_game_end() and moves_played < max_simulated_moves:
+            move = self.heuristic_simulated_move(game)
+            game.push(*move)
+            moves_played += 1
+        if stats is None:
+            winner = game.get_winner()
+        else:
+            start = time.perf_counter()
+            winner = game.get_winner()
+            stats.evaluation_time += time.perf_counter() - start
+            stats.evaluations += 1
+        for _ in range(moves_played):
+            game.pop()
+        return winner
+
+    def heuristic_simulated_move(self, game):
+        # Choose a move based on proximity to friendly or enemy pieces 
+        best_score = -1
+        best_move = None
+        cells = game.cells
+        bonus = game.move_bonus[game.current_player]
+        for i in range(len(cells)):
+            if cells[i] == EMPTY and bonus[i] > best_score:
+                best_score = bonus[i]
+                best_move = i
+        return game.geometry.coords[best_move] if best_move is not None else random.choice(game.get_empty_cells())
+
+
+def batch_scores(boards, geometry, parents=None):
+    """evaluate_score for every row of an (N, cells + 1) int8 board array.
+
+    Groups are labelled for all boards at once by a vectorized union-find
+    (hooking roots along same-coloured contacts, then pointer jumping), and
+    group sizes and contacts come from NumPy reductions. Only the small
+    contracted group graph of each board is handed to _removable_roots.
+    parents, an optional (N, cells) array of union-find parents of stones
+    already joined (such as PartitionsGame._parent), lets the labelling
+    start from those groups, so only the other stones need propagating.
+    Returns (scores, fragments) where fragments marks the cells of every
+    removable group.
+    """
+    import numpy as np
+    num_boards = len(boards)
+    num_cells = geometry.num_cells
+    first_cells, second_cells = geometry.edge_arrays()
+    cells = boards[:, :num_cells]
+    occupied = cells != EMPTY
+    first_colors = cells[:, first_cells]
+    second_colors = cells[:, second_cells]
+    touching = (first_colors != EMPTY) & (second_colors != EMPTY)
+    same_color = touching & (first_colors == second_colors)
+
+    # Union-find over the cells of all boards at once, as flat indices into
+    # boards.ravel(); empty and padding cells stay their own roots
+    span = num_cells + 1
+    board_offsets = np.arange(num_boards, dtype=np.int32)[:, None] * span
+    start = np.arange(num_cells) if parents is None else parents
+    roots = np.empty((num_boards, span), dtype=np.int32)
+    roots[:, :num_cells] = np.where(occupied, start, np.arange(num_cells))
+    roots[:, num_cells] = num_cells
+    roots = (roots + board_offsets).ravel()
+
+    def jump():
+        # Point every cell straight at its root
+        nonlocal roots
+        while True:
+            jumped = roots[roots]
+            if np.array_equal(jumped, roots):
+                return
+            roots = jumped
+
+    jump()
+    # Same-coloured neighbours still in different groups; with parents only the stones outside them
+    grid = roots.reshape(num_boards, span)
+    board, edge = np.nonzero(same_color & (grid[:, first_cells] != grid[:, second_cells]))
+    first = board * span + first_cells[edge]
+    second = board * span + second_cells[edge]
+    while len(first):
+        first_roots, second_roots = roots[first], roots[second]
+        apart = first_roots != second_roots
+        if not apart.any():
+            break
+        first, second = first[apart], second[apart]
+        first_roots, second_roots = first_roots[apart], second_roots[apart]
+        # Hook the larger root under the smaller, so pointers only ever decrease
+        np.minimum.at(roots, np.maximum(first_roots, second_roots), np.minimum(first_roots, second_roots))
+        jump()
+    labels = roots.reshape(num_boards, span) - board_offsets
+
+    sizes = np.bincount(roots.reshape(num_boards, span)[:, :num_cells][occupied],
+                        minlength=num_boards * span).reshape(num_boards, span)
+    # Contacts between different groups, each pair once
+    first_labels = labels[:, first_cells]
+    second_labels = labels[:, second_cells]
+    board, edge = np.nonzero(touching & (first_labels != second_labels))
+    first_labels = first_labels[board, edge]
+    second_labels = second_labels[board, edge]
+    pair_keys = np.unique((board.astype(np.int64) * span + np.minimum(first_labels, second_labels)) * span
+                          + np.maximum(first_labels, second_labels))
+    pair_rows = pair_keys // (span * span)
+    bounds = np.searchsorted(pair_rows, np.arange(num_boards + 1))
+    firsts = (pair_keys // span % span).tolist()
+    seconds = (pair_keys % span).tolist()
+
+    scorer = PartitionsGame(geometry.board_size)
+    removable = np.zeros((num_boards, num_cells + 1), dtype=bool)
+    for row in range(num_boards):
+        adjacency = {root: [] for root in np.flatnonzero(sizes[row]).tolist()}
+        for k in range(bounds[row], bounds[row + 1]):
+            adjacency[firsts[k]].append(seconds[k])
+            adjacency[seconds[k]].append(firsts[k])
+        removable[row, scorer._removable_roots(adjacency)] = True
+
+    # White scores the black fragments and vice versa
+    scores = (sizes * removable * -boards.astype(np.intp)).sum(axis=1)
+    fragments = np.take_along_axis(removable, labels[:, :num_cells], axis=1) & occupied
+    return scores, fragments
+
+
+def batch_playouts(positions, max_moves=20):
+    """Run the MCTSNode.simulate playout from many positions of one board size at once.
+
+    The boards advance together as rows of an (N, cells) int8 array: every
+    step plays the first empty cell with the best move bonus on every
+    board, exactly as heuristic_simulated_move does, with the bonuses kept
+    up to date around each new stone as PartitionsGame.push does. The finished boards are scored with batch_scores, and drawn
+    boards get the get_winner tie-breaker (all fragments inverted, then
+    scored again) as a second batch. Returns the list of winners.
+    """
+    import numpy as np
+    geometry = positions[0].geometry
+    num_cells = geometry.num_cells
+    neighbors = geometry.neighbor_matrix()
+    # The extra last column is always empty and stands in for missing neighbours
+    boards = np.zeros((len(positions), num_cells + 1), dtype=np.int8)
+    parents = np.empty((len(positions), num_cells), dtype=np.int32)
+    white_bonus = np.zeros((len(positions), num_cells + 1), dtype=np.int8)
+    black_bonus = np.zeros((len(positions), num_cells + 1), dtype=np.int8)
+    for row, game in enumerate(positions):
+        boards[row, :num_cells] = np.frombuffer(game.cells, dtype=np.int8)
+        parents[row] = np.frombuffer(game._parent, dtype=np.int32)
+        white_bonus[row, :num_cells] = np.frombuffer(game.move_bonus[WHITE], dtype=np.int8)
+        black_bonus[row, :num_cells] = np.frombuffer(game.move_bonus[BLACK], dtype=np.int8)
+    players = np.array([game.current_player for game in positions], dtype=np.int8)
+
+    for _ in range(max_moves):
+        empty = boards[:, :num_cells] == EMPTY
+        active = np.flatnonzero(empty.any(axis=1))
+        if not len(active):
+            break
+        white_moves = players[active] == WHITE
+        scores = np.where(white_moves[:, None], white_bonus[active, :num_cells], black_bonus[active, :num_cells])
+        scores[~empty[active]] = -1
+        moves = scores.argmax(axis=1)
+        boards[active, moves] = players[active]
+        players[active] = -players[active]
+        # 2 for the mover's and 1 for the opponent's bonus around the new stone (missing neighbours hit the padding)
+        rows = active[:, None]
+        around = neighbors[moves]
+        white_bonus[rows, around] += np.where(white_moves, 2, 1).astype(np.int8)[:, None]
+        black_bonus[rows, around] += np.where(white_moves, 1, 2).astype(np.int8)[:, None]
+
+    # The groups of the starting positions are already known, only the playout stones are new
+    scores, fragments = batch_scores(boards, geometry, parents)
+    winners = np.where(scores > 0, WHITE, BLACK)
+    # Without fragments inverting changes nothing, so the draw stays a draw and Black wins
+    drawn = np.flatnonzero((scores == 0) & fragments.any(axis=1))
+    if len(drawn):
+        inverted = boards[drawn]
+        inverted[:, :num_cells] = np.where(fragments[drawn], -inverted[:, :num_cells], inverted[:, :num_cells])
+        final_scores, _ = batch_scores(inverted, geometry)
+        winners[drawn] = np.where(final_scores > 0, WHITE, BLACK)
+    return winners.tolist()
+
+
+def mcts_simulation_count(board_size):
+    # Determine board size for simulation 
+    if board_size <= 5:
+        return 300
+    elif board_size <= 7:
+        return 150
+    elif board_size <= 9:
+        return 800
+    elif board_size <= 11:
+        return 1000
+    else:
+        return 1500
+
+
+def run_mcts(root, game, simulations, deadline=None, batch_size=1, stop=None, stats=None):
+    """Grow the tree under root by `simulations` playouts, or until deadline (perf_counter time).
+
+    game is the position at root; it is played forward and back during the
+    search and left as it was. With batch_size > 1, leaves are selected
+    batch_size at a time and their playouts run together through
+    batch_playouts; the statistics are updated once the whole batch is done.
+    The search also ends early once the threading.Event `stop` is set.
+    Playouts, expanded nodes, tree depth and playout scoring are added to
+    `stats` (a SearchStats) when one is given. Returns the number of
+    playouts run.
+    """
+    done = 0
+    while done < simulations:
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        if stop is not None and stop.is_set():
+            break
+        paths = []
+        leaves = []
+        results = []
+        for _ in range(min(batch_size, simulations - done)):
+            node = root
+            path = [root]
+            while node.children and not node.untried_moves:
+                node = node.select_child()
+                game.push(*node.move)
+                path.append(node)
+            if node.untried_moves is None:
+                node.untried_moves = game.get_empty_cells()
+            if node.untried_moves:
+                path.append(node.expand(game))
+                if stats is not None:
+                    stats.nodes += 1
+            paths.append(path)
+            if stats is not None and len(path) - 1 > stats.max_depth:
+                stats.max_depth = len(path) - 1
+            if batch_size > 1:
+                leaves.append(game.copy())
+            else:
+                results.append(path[-1].simulate(game, stats))
+            for _ in range(len(path) - 1):
+                game.pop()
+        if leaves:
+            if stats is None:
+                results = batch_playouts(leaves)
+            else:
+                start = time.perf_counter()
+                results = batch_playouts(leaves)
+                stats.evaluation_time += time.perf_counter() - start
+                stats.evaluations += len(leaves)
+        done += len(paths)
+
+        # Update the nodes on each path; the player to move alternates down the tree
+        for path, result in zip(paths, results):
+            player = game.current_player if len(path) % 2 else -game.current_player
+            for node in reversed(path):
+                node.visits += 1
+                if result == player:
+                    node.value += 1
+                player = -player
+    if stats is not None:
+        stats.playouts += done
+    return done
+
+
+def _mcts_root_visits(game, simulations, seed, time_limit, batch_size=1):
+    """Process-pool worker: grow one tree with its own seed and return {move: visits} at the root."""
+    random.seed(seed)
+    root = MCTSNode(untried_moves=game.get_empty_cells())
+    # Playouts are deterministic, so each worker expands the root moves in its own order
+    random.shuffle(root.untried_moves)
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+    run_mcts(root, game.copy(), simulations, deadline, batch_size)
+    return {child.move: child.visits for child in root.children}
+
+
+def parallel_mcts_best_move(game, simulations, workers, seed=None, time_limit=None, executor=None, batch_size=1,
+                            stats=None):
+    """Root-parallel MCTS: split the simulations over `workers` independent trees and sum root visits.
+
+    Worker i is seeded with seed + i. Pass an existing ProcessPoolExecutor to
+    avoid starting a new pool for every move. Only the playouts (the summed
+    root visits) are added to `stats`; the rest stays in the workers.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    if seed is None:
+        seed = random.getrandbits(32)
+    shares = [simulations // workers + (1 if i < simulations % workers else 0) for i in range(workers)]
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(_mcts_root_visits, game, share, seed + i, time_limit, batch_size)
+                   for i, share in enumerate(shares) if share > 0]
+        visits = {}
+        for future in futures:
+            for move, count in future.result().items():
+                visits[move] = visits.get(move, 0) + count
+    finally:
+        if executor is None:
+            pool.shutdown()
+    if stats is not None:
+        stats.playouts += sum(visits.values())
+
+    if not visits:
+        empty = game.get_empty_cells()
+        return random.choice(empty) if empty else None
+    # Most visited move over all trees; ties go to the first cell on the board
+    return max(sorted(visits), key=lambda move: visits[move])
+
+
+def mcts_best_move(game, simulations=None, time_limit=None, workers=1, seed=None, executor=None, batch_size=1,
+                   stats=None):
+    # Pass a SearchStats as stats to have the search counted in it
+    if simulations is None:
+        simulations = mcts_simulation_count(game.board_size)
+    if workers > 1:
+        if game.check_game_end():
+            return None
+        return parallel_mcts_best_move(game, simulations, workers, seed=seed, time_limit=time_limit,
+                                       executor=executor, batch_size=batch_size, stats=stats)
+
+    root = MCTSNode(untried_moves=game.get_empty_cells())
+
+    if not root.untried_moves:
+        return None
+
+    # Run MCTS simulations, stopping early if the time budget runs out
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+    run_mcts(root, game.copy(), simulations, deadline, batch_size, stats=stats)
+
+    # If no children plays a random move
+    if not root.children:
+        empty = game.get_empty_cells()
+        return random.choice(empty) if empty else None
+
+    # Return the move that leads to the most visited child
+    best_child = max(root.children, key=lambda c: c.visits)
+    return best_child.move
+
+
+class MCTSPlayer:
+    """MCTS that keeps its search tree from one turn to the next.
+
+    After each search the tree is re-rooted at the chosen move. On the next
+    call it follows the moves played since then (normally the opponent's
+    reply) down the tree, so the statistics gathered under them are kept.
+    """
+
+    def __init__(self, simulations=None, time_limit=None, batch_size=1):
+        self.simulations = simulations
+        self.time_limit = time_limit
+        self.batch_size = batch_size
+        self.root = None
+        self.board_size = None
+        self.root_key = None       # position_key() of the position at root
+        self.root_moves = 0        # len(game.history) at root
+        self.playouts = 0          # Playouts run by the last search
+        self.stop = None           # Optional threading.Event that ends a running search
+        self.search_root = None    # Root of the running search and its visits when it started
+        self.start_visits = 0
+        self.stats = SearchStats('mcts')  # Counters of the last search
+
+    def _reuse_root(self, game):
+        """The node for game's position in the kept tree, or None."""
+        played = len(game.history) - self.root_moves
+        if self.root is None or game.board_size != self.board_size or played < 0:
+            return None
+        earlier = game.copy()
+        for _ in range(played):
+            earlier.pop()
+        if earlier.position_key() != self.root_key:
+            return None
+        node = self.root
+        coords = game.geometry.coords
+        for i in game.history[len(game.history) - played:]:
+            node = next((child for child in node.children if child.move == coords[i]), None)
+            if node is None:
+                return None
+        return node
+
+    def live_playouts(self):
+        """Playouts run so far by the current search (or the last one), safe to read from another thread."""
+        root = self.search_root
+        return root.visits - self.start_visits if root is not None else self.playouts
+
+    def best_move(self, game):
+        if game.check_game_end():
+            return None
+        root = self._reuse_root(game) or MCTSNode()
+        if root.untried_moves is None:
+            root.untried_moves = game.get_empty_cells()
+
+        simulations = self.simulations or mcts_simulation_count(game.board_size)
+        deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+        self.start_visits = root.visits
+        self.search_root = root
+        self.stats = SearchStats('mcts')
+        try:
+            self.playouts = run_mcts(root, game.copy(), simulations, deadline, self.batch_size, self.stop, self.stats)
+        finally:
+            self.search_root = None
+        if self.stop is not None and self.stop.is_set():
+            self.root = None
+            return None
+
+        # If no children plays a random move
+        if not root.children:
+            self.root = None
+            return random.choice(game.get_empty_cells())
+
+        # Return the move that leads to the most visited child and keep its subtree
+        best_child = max(root.children, key=lambda c: c.visits)
+        after = game.copy()
+        after.push(*best_child.move)
+        self.root = best_child
+        self.board_size = game.board_size
+        self.root_moves = len(after.history)
+        self.root_key = after.position_key()
+        return best_child.move
+
+
+class AIPlayer:
+    def __init__(self, difficulty, algorithm='minimax', time_limit=None, workers=1, seed=None, batch_size=1,
+                 use_book=True, profile=False):
+        self.difficulty = difficulty 
+        self.algorithm = algorithm  
+        # Minimax plays opening moves from the board size's opening book, if one was built
+        self.use_book = use_book
+        # Seconds per move; None keeps the fixed depth / simulation counts
+        self.time_limit = time_limit
+        # Processes for root-parallel MCTS; the pool is started on the first move
+        self.workers = workers
+        self.seed = seed
+        self.executor = None
+        # MCTS playouts run this many at a time through batch_playouts
+        self.batch_size = batch_size
+        # Single-process MCTS keeps its tree between moves
+        self.mcts_player = MCTSPlayer(simulations=100 if difficulty == 'medium' else 500,
+                                      time_limit=time_limit, batch_size=batch_size)
+        # One searcher per player so its transposition table carries over between moves
+        self.minimax_ai = MinimaxAI() if difficulty == 'medium' else MinimaxAI(depth=4)
+        # Search nodes (Minimax) or playouts (MCTS) spent on the last move
+        self.nodes = 0
+        # cancel() sets this to stop a search running in another thread
+        self.stop = threading.Event()
+        self.minimax_ai.stop = self.stop
+        self.mcts_player.stop = self.stop
+        # SearchStats of the last move; with profile=True it also holds a cProfile report
+        self.stats = SearchStats(algorithm)
+        self.profile = profile
+
+    def best_move(self, game):
+        return self.search(game)[0]
+
+    def search(self, game):
+        """Return (move, stats) where stats is the SearchStats of the search that chose the move."""
+        profiler = None
+        if self.profile:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            move = self._search(game)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+        self.stats.time = time.perf_counter() - start
+        if profiler is not None:
+            import pstats
+            self.stats.profile = pstats.Stats(profiler)
+        return move, self.stats
+
+    def _search(self, game):
+        self.nodes = 0
+        self.stats = SearchStats(self.algorithm)
+        if self.algorithm == 'minimax':
+            if self.difficulty == 'easy':
+                return random.choice(game.get_empty_cells())  
+            else:  # medium and hard
+                if self.use_book:
+                    from opening_book import load_book
+                    book = load_book(game.board_size)
+                    move = book.lookup(game) if book is not None else None
+                    if move is not None:
+                        return move
+                move, self.stats = self.minimax_ai.search(game, time_limit=self.time_limit)
+                self.nodes = self.minimax_ai.nodes
+                return move
+        elif self.algorithm == 'mcts':
+            if self.workers == 1:
+                move = self.mcts_player.best_move(game)
+                self.stats = self.mcts_player.stats
+                self.nodes = self.mcts_player.playouts
+                return move
+            if self.executor is None:
+                from concurrent.futures import ProcessPoolExecutor
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            # Give every move its own worker seeds
+            seed = self.seed + len(game.history) * self.workers if self.seed is not None else None
+            simulations = 100 if self.difficulty == 'medium' else 500
+            self.nodes = simulations
+            return mcts_best_move(game, simulations=simulations, time_limit=self.time_limit, workers=self.workers,
+                                  seed=seed, executor=self.executor, batch_size=self.batch_size, stats=self.stats)
+
+    def cancel(self):
+        """Make the running search, and every later one, give up and return None.
+
+        Only single-process searches can be stopped; root-parallel MCTS
+        finishes its current move.
+        """
+        self.stop.set()
+
+    def live_nodes(self):
+        """Nodes or playouts of the search running right now, for progress displays."""
+        if self.algorithm == 'minimax':
+            return self.minimax_ai.nodes
+        return self.mcts_player.live_playouts() if self.workers == 1 else 0
+
+    def close(self):
+        """Shut down the MCTS worker pool, if one was started."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
+def suggest_move(game):
+    ai = MinimaxAI(depth=2) 
+    move = ai.best_move(game)
+    
+    # If minimax fails, return a random empty cell
+    if move is None:
+        empty_cells = game.get_empty_cells()
+        if empty_cells:
+            return random.choice(empty_cells)  
+    return move
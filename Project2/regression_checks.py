@@ -0,0 +1,182 @@
+"""
+Regression checks for the Partitions engine against slow, straightforward references.
+
+Run with:  python regression_checks.py
+           python regression_checks.py --quick   (fewer random positions)
+
+Every check prints its number of mismatches; the exit status is 1 if any failed.
+"""
+import random
+import sys
+
+from partitions_engine import WHITE, BLACK, EMPTY, PartitionsGame, EndgameSolver, MCTSNode, batch_playouts
+from benchmark import random_position
+
+# (board size, positions) scored against the flood-fill reference
+SCORE_CASES = [(5, 300), (7, 200), (9, 100)]
+# (board size, random push/pop steps)
+UNDO_CASES = [(5, 400), (7, 400), (9, 200)]
+# (board size, empty cells left, positions) solved by the endgame solver and by brute force
+ENDGAME_CASES = [(5, 5, 20), (5, 6, 10), (7, 5, 10)]
+# (board size, positions) played out by batch_playouts and by MCTSNode.simulate
+PLAYOUT_CASES = [(5, 256), (7, 256), (9, 128), (13, 64)]
+
+
+def flood_fill(game, stones):
+    """Split a set of cell indices into its connected pieces."""
+    neighbors = game.geometry.neighbors
+    stones = set(stones)
+    pieces = []
+    while stones:
+        piece = {stones.pop()}
+        frontier = list(piece)
+        while frontier:
+            for n in neighbors[frontier.pop()]:
+                if n in stones:
+                    stones.remove(n)
+                    piece.add(n)
+                    frontier.append(n)
+        pieces.append(piece)
+    return pieces
+
+
+def reference_groups(game):
+    """(color, cells) of every same-coloured group, found by flood fill."""
+    groups = []
+    for color in (WHITE, BLACK):
+        stones = [i for i, cell in enumerate(game.cells) if cell == color]
+        groups += [(color, piece) for piece in flood_fill(game, stones)]
+    return groups
+
+
+def reference_fragments(game):
+    """Groups whose removal leaves the other stones in at most one piece."""
+    occupied = {i for i, cell in enumerate(game.cells) if cell != EMPTY}
+    return [(color, cells) for color, cells in reference_groups(game)
+            if len(flood_fill(game, occupied - cells)) <= 1]
+
+
+def reference_score(game):
+    # White scores the black fragments and vice versa
+    return sum(-color * len(cells) for color, cells in reference_fragments(game))
+
+
+def reference_winner(game):
+    score = reference_score(game)
+    if score == 0:
+        # Tie-breaker by inverting every fragment group
+        inverted = game.copy()
+        for color, cells in reference_fragments(game):
+            for i in cells:
+                inverted.cells[i] = -color
+        inverted._reset_groups()
+        score = reference_score(inverted)
+    return WHITE if score > 0 else BLACK
+
+
+def brute_force_winner(game):
+    """Winner with perfect play, trying every order of the remaining moves."""
+    if game.check_game_end():
+        return reference_winner(game)
+    player = game.current_player
+    for move in game.get_empty_cells():
+        game.push(*move)
+        winner = brute_force_winner(game)
+        game.pop()
+        if winner == player:
+            return player
+    return -player
+
+
+def report(name, mismatches, total):
+    print(f"{name}: {mismatches} mismatches in {total} -> {'ok' if not mismatches else 'FAILED'}")
+    return mismatches == 0
+
+
+def check_scoring(scale=1):
+    """evaluate_score, removable_groups and get_winner against the flood-fill reference."""
+    rng = random.Random(1)
+    mismatches = total = 0
+    for board_size, positions in SCORE_CASES:
+        num_cells = PartitionsGame(board_size).geometry.num_cells
+        for seed in range(positions // scale):
+            game = random_position(board_size, rng.randrange(num_cells + 1), seed)
+            coords = game.geometry.coords
+            fragments = sorted((color, sorted(coords[i] for i in cells)) for color, cells in reference_fragments(game))
+            found = sorted((color, sorted(cells)) for color, cells in game.removable_groups())
+            total += 1
+            if (game.evaluate_score() != reference_score(game) or found != fragments
+                    or game.get_winner() != reference_winner(game)):
+                mismatches += 1
+    return report("Scoring vs flood fill", mismatches, total)
+
+
+def check_push_pop(scale=1):
+    """Random pushes and pops keep hash, move_bonus and the cached score in step with the board."""
+    rng = random.Random(2)
+    mismatches = total = 0
+    for board_size, steps in UNDO_CASES:
+        game = PartitionsGame(board_size)
+        start = game.copy()
+        for _ in range(steps // scale):
+            if game.history and (game.check_game_end() or rng.random() < 0.4):
+                # Score the position first, so a stale cached score would show after pop()
+                game.evaluate_score()
+                game.pop()
+            else:
+                game.push(*rng.choice(game.get_empty_cells()))
+            # A copy rebuilt from the cells alone is the reference
+            rebuilt = game.copy()
+            rebuilt._reset_groups()
+            total += 1
+            if (game.hash != rebuilt.hash or game.move_bonus != rebuilt.move_bonus
+                    or game.empty_count != rebuilt.empty_count or game.evaluate_score() != reference_score(game)):
+                mismatches += 1
+        while game.history:
+            game.pop()
+        total += 1
+        if (game.cells != start.cells or game.hash != start.hash or game.move_bonus != start.move_bonus
+                or game.current_player != start.current_player or game._parent != start._parent):
+            mismatches += 1
+    return report("Push/pop consistency", mismatches, total)
+
+
+def check_endgame(scale=1):
+    """EndgameSolver.solve against a brute-force search of every move order."""
+    mismatches = total = 0
+    for board_size, empty_cells, positions in ENDGAME_CASES:
+        solver = EndgameSolver(PartitionsGame(board_size).geometry)
+        num_cells = solver.geometry.num_cells
+        for seed in range(max(1, positions // scale)):
+            game = random_position(board_size, num_cells - empty_cells, seed)
+            winner, move = solver.solve(game)
+            expected = brute_force_winner(game)
+            total += 1
+            if winner != expected or (move is None) != (expected != game.current_player):
+                mismatches += 1
+            elif move is not None:
+                # The returned move must itself win
+                game.push(*move)
+                if brute_force_winner(game) != winner:
+                    mismatches += 1
+                game.pop()
+    return report("Endgame solver vs brute force", mismatches, total)
+
+
+def check_playouts(scale=1):
+    """batch_playouts gives the same winners as MCTSNode.simulate one at a time."""
+    rng = random.Random(3)
+    mismatches = total = 0
+    for board_size, positions in PLAYOUT_CASES:
+        num_cells = PartitionsGame(board_size).geometry.num_cells
+        games = [random_position(board_size, rng.randrange(num_cells + 1), seed) for seed in range(positions // scale)]
+        expected = [MCTSNode().simulate(game.copy()) for game in games]
+        total += len(games)
+        mismatches += sum(a != b for a, b in zip(batch_playouts(games), expected))
+    return report("Batched playouts vs simulate", mismatches, total)
+
+
+if __name__ == '__main__':
+    scale = 4 if "--quick" in sys.argv else 1
+    results = [check(scale) for check in (check_scoring, check_push_pop, check_endgame, check_playouts)]
+    sys.exit(0 if all(results) else 1)
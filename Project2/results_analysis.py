@@ -0,0 +1,200 @@
+"""
+Move-time and score analysis over game log CSVs.
+
+Reads both log formats: the old single-file exports (results/*.csv,
+game_log.csv) whose moves are followed by "Board Size" / "Total" rows, and
+the per-game files written by game_log.GameLogWriter, whose result is in
+games.csv next to them. The move rows of all files are parsed together in
+one NumPy pass into typed columns, and the columns can be cached in an .npz
+sidecar that is reused while none of the files has changed.
+
+Example:
+    python results_analysis.py results/*.csv logs/game_*.csv --cache results/analysis_cache.npz
+"""
+import argparse
+import csv
+import os
+
+import numpy as np
+
+from game_log import FIELDNAMES, STATS_FIELDNAMES, ALGORITHMS
+from partitions_engine import WHITE, BLACK
+
+PERCENTILES = [50, 90, 99]
+# Characters dropped so "(3, 2)" splits into two plain columns
+_STRIP = str.maketrans("", "", '"() ')
+# play, player, algorithm, row, col, time, score_white, score_black, then the optional search stats
+_COLUMNS = 8
+_STATS_COLUMNS = ["nodes", "cutoffs", "tt_hits", "evaluations", "evaluation_time", "playouts", "max_depth"]
+# Bumped when the cached columns change, so older sidecars are rebuilt
+CACHE_VERSION = 2
+
+
+def _split_log(path):
+    """Return (move rows as text, columns per row, board size, winner, total time) of one log file."""
+    with open(path) as file:
+        header, _, text = file.read().partition("\n")
+    header = header.strip()
+    if header == ",".join(FIELDNAMES):
+        columns = _COLUMNS
+    elif header == ",".join(FIELDNAMES + STATS_FIELDNAMES):
+        columns = _COLUMNS + len(STATS_FIELDNAMES)
+    else:
+        raise ValueError(f"{path} is not a game log")
+    moves, _, summary = text.partition(",,,,,,")
+    board_size, winner, total_time = -1, 0, np.nan
+    for row in csv.reader(summary.splitlines()):
+        if row and row[0] == "Board Size":
+            board_size = int(row[2])
+        elif row and row[0] == "Total":
+            winner = WHITE if row[2] == "White" else BLACK
+            total_time = float(row[4])
+    return moves.strip(), columns, board_size, winner, total_time
+
+
+def _game_index(directory):
+    """games.csv rows of a GameLogWriter directory, by game id."""
+    path = os.path.join(directory, "games.csv")
+    if not os.path.exists(path):
+        return {}
+    with open(path, newline="") as file:
+        return {row["game"]: row for row in csv.DictReader(file)}
+
+
+def _parse_rows(blocks, columns):
+    """Parse move rows with `columns` fields each into a float array, in one pass."""
+    # Names become their codes first so every field is a number
+    text = ",".join(blocks).translate(_STRIP).replace("\n", ",")
+    text = text.replace(",White,", f",{WHITE},").replace(",Black,", f",{BLACK},")
+    for code, name in enumerate(ALGORITHMS):
+        text = text.replace(f",{name},", f",{code},")
+    fields = np.fromstring(text, sep=",") if text else np.zeros(0)
+    if len(fields) % columns:
+        raise ValueError("malformed move rows")
+    return fields.reshape(-1, columns)
+
+
+def parse_logs(paths):
+    """Parse log files into (moves, games) dicts of NumPy columns.
+
+    moves has one entry per move: game (index into paths), play, player
+    (WHITE/BLACK), algorithm (index into game_log.ALGORITHMS), row, col,
+    time, score_white and score_black, plus the search stats columns
+    (nodes, cutoffs, tt_hits, evaluations, evaluation_time, playouts,
+    max_depth; NaN for logs written before they were recorded). games has
+    one entry per file: path, board_size (-1 if unknown), winner (0 if
+    unknown) and total_time.
+    """
+    blocks = []
+    widths = []
+    counts = []
+    board_sizes, winners, total_times = [], [], []
+    indexes = {}
+    for path in paths:
+        moves, columns, board_size, winner, total_time = _split_log(path)
+        name = os.path.splitext(os.path.basename(path))[0]
+        if winner == 0 and name.startswith("game_"):
+            # GameLogWriter file: the result is in games.csv
+            directory = os.path.dirname(path)
+            if directory not in indexes:
+                indexes[directory] = _game_index(directory)
+            row = indexes[directory].get(name[len("game_"):])
+            if row is not None:
+                board_size = int(row["board_size"])
+                winner = WHITE if row["winner"] == "White" else BLACK
+                total_time = float(row["total_time (s)"])
+        blocks.append(moves)
+        widths.append(columns)
+        counts.append(moves.count("\n") + 1 if moves else 0)
+        board_sizes.append(board_size)
+        winners.append(winner)
+        total_times.append(total_time)
+
+    # The files of each row width are parsed together; stats columns stay NaN for the older logs
+    game = np.repeat(np.arange(len(paths), dtype=np.int32), counts)
+    fields = np.full((len(game), _COLUMNS + len(_STATS_COLUMNS)), np.nan)
+    for columns in set(widths):
+        files = [i for i, width in enumerate(widths) if width == columns]
+        fields[np.isin(game, files), :columns] = _parse_rows([blocks[i] for i in files if blocks[i]], columns)
+
+    moves = {
+        "game": game,
+        "play": fields[:, 0].astype(np.int16),
+        "player": fields[:, 1].astype(np.int8),
+        "algorithm": fields[:, 2].astype(np.int8),
+        "row": fields[:, 3].astype(np.int16),
+        "col": fields[:, 4].astype(np.int16),
+        "time": fields[:, 5],
+        "score_white": fields[:, 6].astype(np.int32),
+        "score_black": fields[:, 7].astype(np.int32),
+    }
+    for i, name in enumerate(_STATS_COLUMNS):
+        moves[name] = fields[:, _COLUMNS + i]
+    games = {
+        "path": np.array(paths, dtype=str),
+        "board_size": np.array(board_sizes, dtype=np.int16),
+        "winner": np.array(winners, dtype=np.int8),
+        "total_time": np.array(total_times, dtype=np.float64),
+    }
+    return moves, games
+
+
+def load_logs(paths, cache=None):
+    """parse_logs(paths), reusing the .npz sidecar `cache` while the files are unchanged."""
+    paths = [os.path.abspath(path) for path in paths]
+    manifest = np.array([[path, os.stat(path).st_mtime_ns, os.stat(path).st_size] for path in paths], dtype=str)
+    if cache is not None and os.path.exists(cache):
+        with np.load(cache) as data:
+            # A different file list, a changed file or an older cache format is a miss
+            if (data.get("version") == CACHE_VERSION
+                    and np.array_equal(data["manifest"], manifest)):
+                moves = {key[len("moves_"):]: data[key] for key in data.files if key.startswith("moves_")}
+                games = {key[len("games_"):]: data[key] for key in data.files if key.startswith("games_")}
+                return moves, games
+
+    moves, games = parse_logs(paths)
+    if cache is not None:
+        columns = {f"moves_{key}": value for key, value in moves.items()}
+        columns.update({f"games_{key}": value for key, value in games.items()})
+        np.savez(cache, version=CACHE_VERSION, manifest=manifest, **columns)
+    return moves, games
+
+
+def move_time_stats(moves):
+    """Per algorithm: number of moves, mean and percentile move times."""
+    stats = {}
+    for code in np.unique(moves["algorithm"]):
+        times = moves["time"][moves["algorithm"] == code]
+        row = {"moves": len(times), "mean (s)": float(times.mean())}
+        for p, value in zip(PERCENTILES, np.percentile(times, PERCENTILES)):
+            row[f"p{p} (s)"] = float(value)
+        stats[ALGORITHMS[code]] = row
+    return stats
+
+
+def score_trajectories(moves, games):
+    """(games, longest game) array of score_white - score_black after every play, NaN after a game ends."""
+    trajectories = np.full((len(games["path"]), int(moves["play"].max(initial=0))), np.nan)
+    trajectories[moves["game"], moves["play"] - 1] = moves["score_white"] - moves["score_black"]
+    return trajectories
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize Partitions game logs.")
+    parser.add_argument("paths", nargs="+", help="game log CSV files")
+    parser.add_argument("--cache", default=None, help=".npz sidecar for the parsed columns")
+    args = parser.parse_args()
+
+    moves, games = load_logs(args.paths, args.cache)
+    print(f"{len(games['path'])} games, {len(moves['play'])} moves")
+    for algorithm, row in move_time_stats(moves).items():
+        print(f"  {algorithm:8} " + "  ".join(f"{key} {value:.4g}" for key, value in row.items()))
+    trajectory = np.nanmean(score_trajectories(moves, games), axis=0)
+    if len(trajectory):
+        plays = [min(p, len(trajectory)) for p in (10, 20, 30, len(trajectory))]
+        print("Mean score (white - black) after plays " + "/".join(map(str, plays)) + ": "
+              + " / ".join(f"{trajectory[p - 1]:.2f}" for p in plays))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""
+Headless Computer vs Computer tournaments for the Partitions AI.
+
+Plays every pairing of the chosen algorithm/difficulty configurations on
+every board size, spreading the games over a process pool, and writes one
+CSV row per pairing with win rates, move-time percentiles and search nodes.
+With --archive every move is also kept in a MoveArchive (see game_log.py),
+written as each game finishes.
+
+Example:
+    python tournament.py --sizes 5 7 --algorithms minimax mcts --difficulties easy medium --games 20 --workers 8
+"""
+import argparse
+import csv
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+
+import numpy as np
+
+from game_log import MoveArchive
+from partitions_engine import PartitionsGame, AIPlayer, WHITE
+
+PERCENTILES = [50, 90, 99]
+
+
+def play_game(board_size, white, black, seed, time_limit=None):
+    """Play one game between two (algorithm, difficulty) configurations.
+
+    Returns the winner, the moves and the score after each of them, plus
+    the move times and search nodes of each side.
+    """
+    random.seed(seed)
+    game = PartitionsGame(board_size)
+    players = {WHITE: AIPlayer(white[1], white[0], time_limit=time_limit),
+               -WHITE: AIPlayer(black[1], black[0], time_limit=time_limit)}
+    times = {WHITE: [], -WHITE: []}
+    nodes = {WHITE: [], -WHITE: []}
+    moves = []
+    scores = []
+    try:
+        while not game.check_game_end():
+            player = game.current_player
+            start = time.perf_counter()
+            move = players[player].best_move(game)
+            times[player].append(time.perf_counter() - start)
+            nodes[player].append(players[player].nodes)
+            game.make_move(*move)
+            moves.append(move)
+            scores.append(game.evaluate_score())
+    finally:
+        for ai in players.values():
+            ai.close()
+    return {
+        "board_size": board_size,
+        "white": white,
+        "black": black,
+        "winner": game.get_winner(),
+        "moves": moves,
+        "scores": scores,
+        "times": times,
+        "nodes": nodes,
+    }
+
+
+def run_tournament(sizes, configs, games, workers=1, seed=0, time_limit=None):
+    """Play `games` games for every board size and ordered pair of configurations.
+
+    Yields each result as soon as its game finishes, so with several
+    workers the order follows the finishing times, not the pairings.
+    """
+    jobs = []
+    for board_size, white, black in product(sizes, configs, configs):
+        for _ in range(games):
+            jobs.append((board_size, white, black, seed + len(jobs), time_limit))
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(play_game, *job) for job in jobs]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                # Don't start the remaining games if the caller stops early
+                for future in futures:
+                    future.cancel()
+    else:
+        for job in jobs:
+            yield play_game(*job)
+
+
+def _label(config):
+    return f"{config[0]}-{config[1]}"
+
+
+def summarize(results):
+    """One row per (board size, white, black) with win rates, move-time percentiles and node counts."""
+    pairings = {}
+    for result in results:
+        pairings.setdefault((result["board_size"], result["white"], result["black"]), []).append(result)
+
+    rows = []
+    for (board_size, white, black), games in sorted(pairings.items()):
+        white_wins = sum(1 for game in games if game["winner"] == WHITE)
+        row = {
+            "board_size": board_size,
+            "white": _label(white),
+            "black": _label(black),
+            "games": len(games),
+            "white_wins": white_wins,
+            "black_wins": len(games) - white_wins,
+            "white_win_rate": round(white_wins / len(games), 4),
+        }
+        for side, color in (("white", WHITE), ("black", -WHITE)):
+            times = np.array([t for game in games for t in game["times"][color]])
+            nodes = np.array([n for game in games for n in game["nodes"][color]])
+            for p in PERCENTILES:
+                row[f"{side}_time_p{p} (s)"] = round(float(np.percentile(times, p)), 4) if len(times) else 0.0
+            row[f"{side}_nodes_per_move"] = round(float(nodes.mean()), 1) if len(nodes) else 0.0
+        rows.append(row)
+    return rows
+
+
+def archive_result(archive, result):
+    """Append the moves and result of one game to a MoveArchive."""
+    game = archive.new_game()
+    times = {color: iter(result["times"][color]) for color in (WHITE, -WHITE)}
+    algorithms = {WHITE: result["white"][0], -WHITE: result["black"][0]}
+    player = WHITE
+    for play, (move, score) in enumerate(zip(result["moves"], result["scores"]), 1):
+        archive.add_move(game, play, player, algorithms[player], move, next(times[player]),
+                         max(score, 0), max(-score, 0))
+        player = -player
+    total_time = sum(result["times"][WHITE]) + sum(result["times"][-WHITE])
+    archive.add_game(game, result["board_size"], result["winner"], len(result["moves"]), total_time)
+
+
+def write_summary(rows, filename):
+    with open(filename, mode="w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play headless Partitions AI tournaments.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5])
+    parser.add_argument("--algorithms", nargs="+", default=["minimax", "mcts"], choices=["minimax", "mcts"])
+    parser.add_argument("--difficulties", nargs="+", default=["easy", "medium"], choices=["easy", "medium", "hard"])
+    parser.add_argument("--games", type=int, default=10, help="games per board size and pairing")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes playing games")
+    parser.add_argument("--time-limit", type=float, default=None, help="seconds per AI move")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join("results", "tournament.csv"))
+    parser.add_argument("--archive", default=None, help="also append every move to this MoveArchive directory")
+    args = parser.parse_args()
+    if args.games < 1:
+        parser.error("--games must be at least 1")
+
+    configs = list(product(args.algorithms, args.difficulties))
+    start = time.time()
+    archive = MoveArchive(args.archive) if args.archive else None
+    results = []
+    try:
+        for result in run_tournament(args.sizes, configs, args.games, args.workers, args.seed, args.time_limit):
+            if archive is not None:
+                archive_result(archive, result)
+            # The summary only needs the times and nodes, so the moves are not kept
+            del result["moves"], result["scores"]
+            results.append(result)
+    finally:
+        if archive is not None:
+            archive.flush()
+    rows = summarize(results)
+    write_summary(rows, args.output)
+    print(f"{len(results)} games in {time.time() - start:.1f}s, summary written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()